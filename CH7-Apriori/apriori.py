@@ -1,9 +1,63 @@
 import argparse
-from itertools import chain, combinations
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, combinations, islice
+from time import perf_counter
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(bits):
+        '''COUNTS SET BITS OF AN INT BITSET'''
+        return bin(bits).count('1')
+
+def tids_to_bitset(tids, size):
+    '''PACKS TRANSACTION IDS INTO AN INT BITSET'''
+    ''' 将事务编号列表转换为位集（整数），第tid位为1表示第tid个事务包含该项 '''
+    buf = bytearray((size + 7) // 8)
+    for tid in tids:
+        buf[tid >> 3] |= 1 << (tid & 7)
+    return int.from_bytes(bytes(buf), 'little')
+
+class ItemDictionary(object):
+    '''MAPS ITEMS TO DENSE INTEGER IDS'''
+    ''' 项字典：把每个项（字符串）映射为从0开始的连续整数编号，项集用排好序的编号元组表示，比字符串的frozenset省内存 '''
+    ''' 只在输出结果时才把编号解码回字符串 '''
+    __slots__ = ('ids', 'items')
+
+    def __init__(self):
+        self.ids = dict() #项 -> 编号
+        self.items = list() #编号 -> 项
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        '''RETURNS THE ID OF ITEM, ASSIGNING A NEW ONE IF NEEDED'''
+        index = self.ids.get(item)
+        if index is None:
+            index = self.ids[item] = len(self.items)
+            self.items.append(item)
+        return index
+
+    def encode(self, row):
+        '''ENCODES A TRANSACTION AS A SORTED TUPLE OF ITEM IDS'''
+        return tuple(sorted(set(self.add(item) for item in row if item)))
+
+    def decode(self, itemset):
+        '''DECODES A TUPLE OF ITEM IDS BACK TO ITEMS'''
+        return tuple(self.items[index] for index in itemset)
+
+    def decode_itemsets(self, itemsets):
+        '''DECODES AN {ITEMSET: SUPPORT} DICT TO {frozenset OF ITEMS: SUPPORT}'''
+        return dict((frozenset(self.decode(itemset)), support) for itemset, support in itemsets.items())
 
 class Rule(object):
     '''ASSOCIATION RULES'''
-    '''一个规则类，成员包含规则前件A，后件B，规则的支持度，置信度，time是规则的序号，无意义'''
+    '''一个规则类，成员包含规则前件A，后件B（项编号元组），规则的支持度，置信度，time是规则的序号，无意义'''
+    __slots__ = ('A', 'B', 'support', 'confidence', 'time')
+
     def __init__(self, A, B, support, confidence, time):
         self.A = A
         self.B = B
@@ -12,26 +66,125 @@ class Rule(object):
         self.time = time
 
     def __repr__(self):
-        return '%s ==> %-6s\t%.3f\t%.3f' % (' '.join(sorted(list(self.A))),
-                                        ' '.join(sorted(list(self.B))),
+        return self.format()
+
+    def format(self, items=None):
+        '''FORMATS THE RULE, DECODING ITEM IDS WITH THE GIVEN ItemDictionary'''
+        decode = items.decode if items is not None else tuple
+        return '%s ==> %-6s\t%.3f\t%.3f' % (' '.join(sorted(str(item) for item in decode(self.A))),
+                                        ' '.join(sorted(str(item) for item in decode(self.B))),
                                         self.confidence,
                                         self.support)
 
+class HashTree(object):
+    '''HASH TREE OF CANDIDATE k-ITEMSETS'''
+    ''' 候选集哈希树：内部节点按第depth项的哈希值分支，叶子节点存放候选集 '''
+    ''' 每个事务只需遍历一次哈希树，就能给它包含的所有候选集计数 '''
+
+    class Node(object):
+        __slots__ = ('children', 'bucket', 'visited')
+
+        def __init__(self):
+            self.children = None #内部节点的子节点列表，叶子节点为None
+            self.bucket = [] #叶子节点中候选集的编号
+            self.visited = -1 #最后一次访问该叶子的事务编号，避免同一事务对同一叶子重复计数
+
+    def __init__(self, candidates, k, fanout=8, leaf_size=16):
+        self.k = k
+        self.fanout = fanout
+        self.leaf_size = leaf_size
+        self.candidates = [tuple(c) for c in candidates] #候选集（排好序的项编号元组）
+        self.candidate_sets = [frozenset(c) for c in self.candidates]
+        self.counts = [0] * len(self.candidates)
+        self.root = self.Node()
+        self._tid = 0
+        for index in range(len(self.candidates)):
+            self._insert(index)
+
+    def _insert(self, index):
+        node, depth = self.root, 0
+        candidate = self.candidates[index]
+        while node.children is not None:
+            node = node.children[hash(candidate[depth]) % self.fanout]
+            depth += 1
+        node.bucket.append(index)
+        if len(node.bucket) > self.leaf_size and depth < self.k:
+            # 叶子节点过满，按下一项的哈希值分裂
+            bucket, node.bucket = node.bucket, []
+            node.children = [self.Node() for _ in range(self.fanout)]
+            for i in bucket:
+                node.children[hash(self.candidates[i][depth]) % self.fanout].bucket.append(i)
+
+    def count(self, transaction):
+        '''INCREMENTS EVERY CANDIDATE CONTAINED IN THE SORTED TRANSACTION'''
+        self._tid += 1
+        if len(transaction) >= self.k:
+            self._count(self.root, transaction, frozenset(transaction), 0, 0)
+
+    def _count(self, node, transaction, items, start, depth):
+        if node.children is None:
+            if node.visited != self._tid:
+                node.visited = self._tid
+                for i in node.bucket:
+                    if self.candidate_sets[i] <= items:
+                        self.counts[i] += 1
+            return
+        for i in range(start, len(transaction) - (self.k - depth) + 1):
+            self._count(node.children[hash(transaction[i]) % self.fanout], transaction, items, i + 1, depth + 1)
+
 class Apriori(object):
     '''APRIORI'''
     '''初始化，设定数据集，支持度阈值，置信度阈值，同时计算出频繁集'''
-    def __init__(self, data, min_support, min_confidence):
+    ''' counting='vertical'时把事务转换成每个项的位集计数；counting='horizontal'时每一层用哈希树扫描一遍事务计数，'''
+    ''' 不把事务集保存在内存中，此时data需要能多次遍历，例如 lambda: data_from_txt(filename) '''
+    ''' 所有项集都用排好序的项编号元组表示，self.items是编号与项之间的对照表 '''
+    ''' 给定partition_size时使用SON分块算法：每次只读入partition_size个事务，在块内挖掘局部频繁集（可用n_jobs个进程并行），'''
+    ''' 再流式扫描一遍全部事务验证局部频繁集的全局支持度，内存只与块大小有关，适合比内存还大的事务文件 '''
+    ''' n_jobs > 1时，k>1层的候选集计数也把事务分块交给n_jobs个进程分别用哈希树计数，再把计数相加，结果与串行完全相同 '''
+    def __init__(self, data, min_support, min_confidence, counting='vertical', partition_size=None, n_jobs=1):
+        if counting not in ('vertical', 'horizontal'):
+            raise ValueError('ERROR: COUNTING MUST BE vertical OR horizontal')
+        if (counting == 'horizontal' or partition_size) and not callable(data) and iter(data) is data:
+            raise ValueError('ERROR: THIS MODE READS THE DATA MORE THAN ONCE, PASS A FUNCTION RETURNING AN ITERATOR')
         self.data = data
         self.min_support = min_support
         self.min_confidence = min_confidence
-        self.itemset, self.transaction_list = self.get_itemset_from_data()
-        self.frequent_itemset = self.get_frequent_itemset()
+        self.counting = counting
+        self.partition_size = partition_size
+        self.n_jobs = n_jobs
+        self.candidate_counter = Counter() #记录生成的候选集个数（generated）和被子集剪枝掉的个数（pruned），用于性能分析
+        self.items = ItemDictionary()
+        if partition_size:
+            self.itemset, self.transaction_list = set(), None
+            self.frequent_itemset = self.get_frequent_itemset_partitioned()
+        else:
+            self.itemset, self.transaction_list = self.get_itemset_from_data()
+            self.frequent_itemset = self.get_frequent_itemset()
 
     @staticmethod
-    def join_set(itemset, k):
-        '''JOINS TWO ITEMSETS TO GET A k LENGTH UNION'''
-        '''使用两个k-1阶频繁子集生成k阶候选集，这里简单使用了union方法，效率低，有重复，可优化'''
-        return set([i.union(j) for i in itemset for j in itemset if len(i.union(j)) == k])
+    def join_set(itemset, k, counter=None):
+        '''JOINS (k-1)-ITEMSETS SHARING THEIR FIRST k-2 ITEMS INTO k-ITEMSETS'''
+        ''' 将k-1阶频繁集按字典序排序，只合并前k-2项相同的两个项集，每个k阶候选集只生成一次 '''
+        ''' 然后用k-1阶频繁集的哈希集合检查候选集的所有k-1阶子集是否都频繁（Apriori性质），不满足的剪掉 '''
+        frequent = set(itemset)
+        groups = dict()
+        for items in sorted(itemset):
+            groups.setdefault(items[:-1], []).append(items[-1])
+        candidates, generated, pruned = set(), 0, 0
+        for prefix, lasts in groups.items():
+            for index, a in enumerate(lasts):
+                for b in lasts[index + 1:]:
+                    generated += 1
+                    candidate = prefix + (a, b)
+                    # 去掉最后两项之一得到的子集就是参与合并的两个项集，不用再检查
+                    if all(candidate[:i] + candidate[i + 1:] in frequent for i in range(k - 2)):
+                        candidates.add(candidate)
+                    else:
+                        pruned += 1
+        if counter is not None:
+            counter['generated'] += generated
+            counter['pruned'] += pruned
+        return candidates
 
     @staticmethod
     def get_combined_subsets(itemset):
@@ -39,64 +192,263 @@ class Apriori(object):
         ''' 这里用于生成频繁集所有可能的子集，构造规则的时候使用，这里也可以剪枝优化 '''
         return chain(*[combinations(itemset, index + 1) for index, item in enumerate(itemset)])
 
+    def transactions(self):
+        '''ITERATES OVER THE TRANSACTIONS'''
+        return self.data() if callable(self.data) else iter(self.data)
+
     def get_itemset_from_data(self):
         '''EXTRACTS ITEMSET FROM DATABASE'''
         ''' 这里使用set找出了所有的可能项（顺便也构造了1-项集），同时构造出了事务集列表'''
-        itemset = set()
+        ''' 同时构造垂直表示：每个项对应一个位集，记录包含该项的所有事务 '''
+        ''' 水平计数时只扫描一遍统计各项的计数和事务个数，不保存事务集 '''
+        if self.counting == 'horizontal':
+            self.item_counts = Counter()
+            self.transaction_count = 0
+            for row in self.transactions():
+                self.transaction_count += 1
+                self.item_counts.update(self.items.encode(row))
+            return set((item,) for item in range(len(self.items))), None
         transaction_list = list()
-        for row in self.data:
-            transaction_list.append(frozenset(row))
-            for item in row:
-                if item:
-                    itemset.add(frozenset([item]))
-        return itemset, transaction_list
+        item_tids = list()
+        for tid, row in enumerate(self.transactions()):
+            transaction = self.items.encode(row)
+            transaction_list.append(transaction)
+            for item in transaction:
+                if item == len(item_tids):
+                    item_tids.append([])
+                item_tids[item].append(tid)
+        self.item_tidsets = [tids_to_bitset(tids, len(transaction_list)) for tids in item_tids]
+        self.tidsets = dict()
+        self.transaction_count = len(transaction_list)
+        return set((item,) for item in range(len(self.items))), transaction_list
+
+    def get_tidset(self, itemset):
+        '''RETURNS THE BITSET OF TRANSACTIONS CONTAINING THE ITEMSET'''
+        ''' 候选k-项集的位集 = 其前k-1项构成的频繁子集（上一层已算好）的位集 AND 最后一项的位集 '''
+        if len(itemset) == 1:
+            return self.item_tidsets[itemset[0]]
+        parent = self.tidsets.get(itemset[:-1])
+        if parent is not None:
+            return parent & self.item_tidsets[itemset[-1]]
+        bits = -1
+        for item in itemset:
+            bits &= self.item_tidsets[item]
+        return bits
 
     def get_support_list(self):
         '''GENERATES SUPPORT LIST HIGHER THAN MINIMUM SUPPORT THRESHOLD'''
-        ''' 这里计算当前k-项集的支持度，并使用支持度阈值进行筛选，判断一个事务是否支持项集直接使用了issubset方法，这里也可以进行优化'''
-        unpruned_list = [(item, float(sum(1 for row in self.transaction_list if item.issubset(row)))/len(self.transaction_list))
-                         for item in self.itemset]
-        return dict([(item, support) for item, support in unpruned_list if support >= self.min_support])
+        ''' 这里计算当前k-项集的支持度，并使用支持度阈值进行筛选，支持度即项集位集中1的个数（popcount）'''
+        ''' 频繁项集的位集保存在self.tidsets中，供下一层候选集复用 '''
+        if self.counting == 'horizontal' or (self.n_jobs > 1 and len(next(iter(self.itemset), ())) > 1):
+            return self.get_support_list_horizontal()
+        tidsets, support_list = dict(), dict()
+        for item in self.itemset:
+            bits = self.get_tidset(item)
+            support = float(popcount(bits)) / self.transaction_count
+            if support >= self.min_support:
+                tidsets[item] = bits
+                support_list[item] = support
+        self.tidsets = tidsets
+        return support_list
+
+    def get_support_list_horizontal(self):
+        '''COUNTS CANDIDATE SUPPORT WITH ONE STREAMING PASS OVER THE TRANSACTIONS'''
+        ''' 将k阶候选集放入哈希树，逐个读入事务（去掉非频繁项并排序）后在哈希树中给其包含的候选集计数 '''
+        candidates = list(self.itemset)
+        if not candidates:
+            return dict()
+        k = len(candidates[0])
+        if k == 1:
+            counts = dict((c, self.item_counts[c[0]]) for c in candidates)
+        else:
+            counts, _ = self.count_candidates(candidates)
+        support_list = dict()
+        for candidate in candidates:
+            support = float(counts[candidate]) / self.transaction_count
+            if support >= self.min_support:
+                support_list[candidate] = support
+        return support_list
+
+    def count_candidates(self, candidates):
+        '''COUNTS CANDIDATES OF ANY LENGTH WITH ONE STREAMING PASS OVER THE TRANSACTIONS'''
+        ''' 每种长度的候选集建一棵哈希树，逐个读入事务（只保留候选集中出现过的项并排序）后在每棵树中计数 '''
+        ''' 返回 {候选集: 计数} 和事务个数 '''
+        ''' n_jobs > 1时，每个进程建一次哈希树，按块计数后由主进程把各块的计数相加 '''
+        lengths = dict()
+        for candidate in candidates:
+            lengths.setdefault(len(candidate), []).append(candidate)
+        groups = list(lengths.values())
+        items = set(item for candidate in candidates for item in candidate)
+        transactions = self.encoded_transactions(items)
+        if self.n_jobs > 1:
+            totals = [[0] * len(group) for group in groups]
+            transaction_count = 0
+            chunks = chunked(transactions, self.partition_size or 10000)
+            for chunk_counts, chunk_size in self.map_partitions(count_chunk, chunks, init_counting, (groups,)):
+                transaction_count += chunk_size
+                for total, chunk_count in zip(totals, chunk_counts):
+                    for index, count in enumerate(chunk_count):
+                        total[index] += count
+        else:
+            trees = [HashTree(group, len(group[0])) for group in groups]
+            transaction_count = 0
+            for transaction in transactions:
+                transaction_count += 1
+                for tree in trees:
+                    tree.count(transaction)
+            totals = [tree.counts for tree in trees]
+        counts = dict()
+        for group, total in zip(groups, totals):
+            counts.update(zip(group, total))
+        return counts, transaction_count
+
+    def encoded_transactions(self, items):
+        '''ITERATES OVER TRANSACTIONS AS SORTED ID TUPLES RESTRICTED TO items'''
+        ''' 垂直计数时事务已编码保存在transaction_list中，否则流式读入并用项字典编码 '''
+        if self.transaction_list is not None:
+            for transaction in self.transaction_list:
+                yield tuple(item for item in transaction if item in items)
+            return
+        ids = self.items.ids
+        for row in self.transactions():
+            yield tuple(sorted(set(item for item in map(ids.get, row) if item in items)))
+
+    def map_partitions(self, function, chunks, initializer=None, initargs=()):
+        '''APPLIES function(chunk) TO EACH CHUNK, ON A PROCESS POOL WHEN n_jobs > 1'''
+        ''' 结果按块的顺序返回；最多同时提交2*n_jobs个块，保证读入内存的事务块数量有上限 '''
+        if self.n_jobs <= 1:
+            if initializer is not None:
+                initializer(*initargs)
+            for chunk in chunks:
+                yield function(chunk)
+            return
+        with ProcessPoolExecutor(self.n_jobs, initializer=initializer, initargs=initargs) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(function, chunk))
+                if len(pending) >= 2 * self.n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def get_frequent_itemset_partitioned(self):
+        '''GENERATES FREQUENT ITEMSETS WITH THE SON PARTITION ALGORITHM'''
+        ''' 第一遍：在每个块内挖掘局部频繁集（使用相同的相对支持度阈值），全局频繁集一定是某个块的局部频繁集 '''
+        ''' 第二遍：流式扫描全部事务，统计所有局部频繁集的全局支持度并用阈值筛选 '''
+        candidates = set()
+        mine = partial(mine_partition, min_support=self.min_support)
+        for local_itemsets in self.map_partitions(mine, chunked(self.transactions(), self.partition_size)):
+            for itemset in local_itemsets:
+                candidates.add(tuple(sorted(self.items.add(item) for item in itemset)))
+        counts, self.transaction_count = self.count_candidates(candidates)
+        frequent_itemset = dict()
+        for candidate, count in counts.items():
+            support = float(count) / self.transaction_count
+            if support >= self.min_support:
+                frequent_itemset[candidate] = support
+        return frequent_itemset
 
     
     def get_frequent_itemset(self):
         '''GENERATES FREQUENT ITEMSETS'''
         ''' 计算所有频繁项集 '''
-        ''' 这种处理方式没有通过字典序要求合并k-1阶项集来避免生成重复的k阶项集，也没有使用k-1阶频繁集筛选k阶频繁集！！！！！'''
+        ''' 通过join_set按字典序合并k-1阶项集（不会生成重复的k阶项集），并用k-1阶频繁集剪枝候选集 '''
         frequent_itemset = dict()
         k = 1
         while True:
             ''' 当k=1时，直接用get_itemset_from_data中构造的1-项集计算支持度同时用阈值筛选 '''
             ''' 当k>1时，用上次获得的k-1-项集组合生成k-项集，再计算其支持度并用阈值筛选'''
             if k > 1:
-                self.itemset = self.join_set(next_itemset, k)
+                self.itemset = self.join_set(next_itemset, k, self.candidate_counter)
             next_itemset = self.get_support_list()
             ''' 如果所有的候选都被阈值筛选掉了，结束 '''
             if not next_itemset:
                 break
-            ''' 记录找到的频繁集，前面k-1阶合并得到k阶进行了所有可能的合并，所有有重复，这里使用update方法去掉重复 '''            
+            ''' 记录找到的频繁集 '''
             frequent_itemset.update(next_itemset)
             k += 1
         return frequent_itemset
 
+    def generate_rules(self):
+        '''GENERATES ASSOCIATION RULES LAZILY'''
+        ''' 对每个频繁集，后件从1项开始逐层增长，用join_set合并上一层通过的后件生成下一层后件 '''
+        ''' 置信度满足反单调性：后件B不满足阈值时，B的所有超集作后件也不会满足，因此不再扩展 '''
+        ''' 规则逐条yield，不会一次性把所有规则保存在内存中；支持度直接从以编号元组为键的频繁集字典中查找 '''
+        supports = self.frequent_itemset
+        time = 0
+        for itemset, support in self.frequent_itemset.items(): #对所有的频繁集进行枚举
+            if len(itemset) < 2:
+                continue
+            size = 1
+            consequents = [(item,) for item in itemset]
+            while consequents:
+                passed = []
+                for B in consequents:
+                    A = tuple(item for item in itemset if item not in B) #前件
+                    confidence = float(support) / supports[A]
+                    if confidence >= self.min_confidence:
+                        yield Rule(A, B, support=support, confidence=confidence, time=time)
+                        time += 1
+                        passed.append(B)
+                size += 1
+                consequents = self.join_set(passed, size) if size < len(itemset) else []
+
     def run(self):
         '''RUNS APRIORI ALGORITHM'''
-        ''' 针对每个频繁集，构建可能规则集并计算置信度进行筛选 '''
-        ''' 这里构造了所有可能的规则进行置信度筛选，没有使用反单调性进行剪枝，可优化！！！！！！！！'''
-        rules, time = list(), 0
-        for item, support in self.frequent_itemset.items(): #对所有的频繁集进行枚举
-            if len(item) > 1:
-                for A in self.get_combined_subsets(item): #对所有可能子集进行枚举
-                    B = item.difference(A) #后件
-                    if B:
-                        A = frozenset(A)
-                        AB = A | B
-                        confidence = float(self.frequent_itemset[AB]) / self.frequent_itemset[A]
-                        if confidence >= self.min_confidence:
-                            rules.append(Rule(A, B, support=self.frequent_itemset[AB], confidence=confidence, time=time))
-                            time += 1
+        ''' 针对每个频繁集，用generate_rules逐层生成规则并按置信度剪枝 '''
+        rules = list(self.generate_rules())
         return rules, self.frequent_itemset
 
+def chunked(iterable, size):
+    '''SPLITS AN ITERABLE INTO LISTS OF AT MOST size ELEMENTS'''
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+_counting_trees = None
+
+def init_counting(groups):
+    '''BUILDS THE HASH TREES OF A COUNTING WORKER'''
+    global _counting_trees
+    _counting_trees = [HashTree(group, len(group[0])) for group in groups]
+
+def count_chunk(transactions):
+    '''COUNTS CANDIDATES IN ONE CHUNK OF ENCODED TRANSACTIONS'''
+    for tree in _counting_trees:
+        tree.counts = [0] * len(tree.candidates)
+    for transaction in transactions:
+        for tree in _counting_trees:
+            tree.count(transaction)
+    return [tree.counts for tree in _counting_trees], len(transactions)
+
+def mine_partition(transactions, min_support):
+    '''MINES LOCALLY FREQUENT ITEMSETS OF ONE CHUNK OF TRANSACTIONS'''
+    ''' 返回解码后的项元组，各个块的项编号互不相同，由调用者统一编码 '''
+    apriori = Apriori(transactions, min_support, 1.0)
+    return [apriori.items.decode(itemset) for itemset in apriori.frequent_itemset]
+
+def benchmark(filename, min_support, max_jobs=4, counting='horizontal', repeat=1):
+    '''TIMES MINING WITH 1 TO max_JOBS WORKER PROCESSES'''
+    ''' 用1到max_jobs个进程分别挖掘同一个文件，打印耗时和相对1个进程的加速比，并检查结果与串行完全一致 '''
+    data = partial(data_from_txt, filename)
+    baseline, reference = None, None
+    print('n_jobs\tseconds\tspeedup')
+    for n_jobs in range(1, max_jobs + 1):
+        best = None
+        for _ in range(repeat):
+            start = perf_counter()
+            apriori = Apriori(data, min_support, 1.0, counting=counting, n_jobs=n_jobs)
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if reference is None:
+            baseline, reference = best, apriori.frequent_itemset
+        elif apriori.frequent_itemset != reference:
+            raise AssertionError('ERROR: n_jobs=%d GAVE A DIFFERENT RESULT' % n_jobs)
+        print('%d\t%.3f\t%.2fx' % (n_jobs, best, baseline / best))
+
 def parse_arguments():
     '''PARSES COMMAND LINE ARGUMENTS'''
     argparser = argparse.ArgumentParser(description='Apriori Algorithm.')
@@ -123,37 +475,40 @@ def parse_arguments():
 
 def data_from_txt(filename):
     '''EXTRACTS DATABASE FROM .txt FILE'''
-    file = open(filename, 'r')
-    for line in file:
-        row = line.strip().split()        
-        yield row
+    with open(filename, 'r') as file:
+        for line in file:
+            row = line.strip().split()
+            yield row
 
-def print_frequent_itemsets(itemset):
+def print_frequent_itemsets(itemset, items=None):
     '''PRINTS FREQUENT ITEMSETS'''
+    ''' items是Apriori.items（ItemDictionary），用于把项编号解码成字符串 '''
     print('========================')
     print('Itemset\t\tSupport')
     print('========================')
     for item in itemset.keys():
-        print('%s\t\t%.3f' % (' '.join(sorted(list(item))), itemset[item]))
+        names = items.decode(item) if items is not None else item
+        print('%s\t\t%.3f' % (' '.join(sorted(str(name) for name in names)), itemset[item]))
 
-def print_association_rules(rules):
+def print_association_rules(rules, items=None):
     '''PRINTS ASSOCIATION RULES'''
     print('========================================')
     print('    Rule\tConfidence\tSupport')
     print('========================================')
     rules.sort(key=lambda x: (len(x.A) + len(x.B), x.confidence, x.support, -x.time), reverse=True)
     for rule in rules:
-        print(rule)
+        print(rule.format(items))
 
 def main():
     '''MAIN METHOD'''
     min_support = 0.2
     min_confidence = 0.6
     data = data_from_txt('transactions.txt')    
-    rules, itemset = Apriori(data, min_support, min_confidence).run()
+    apriori = Apriori(data, min_support, min_confidence)
+    rules, itemset = apriori.run()
     print('Mined {}\nand found a total of {} association rules:'.format('transactions', len(rules)))
-    print_association_rules(rules)
-    print_frequent_itemsets(itemset)
+    print_association_rules(rules, apriori.items)
+    print_frequent_itemsets(itemset, apriori.items)
 
 if __name__ == '__main__':
     main()
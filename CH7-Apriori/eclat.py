@@ -0,0 +1,151 @@
+from apriori import ItemDictionary, data_from_txt, popcount, print_frequent_itemsets, tids_to_bitset
+
+def vertical_database(data):
+    '''BUILDS THE ITEM DICTIONARY, ONE TRANSACTION BITSET PER ITEM AND THE TRANSACTION COUNT'''
+    ''' 扫描一遍事务，为每个项构造包含它的事务位集（与Apriori的垂直表示相同）'''
+    items = ItemDictionary()
+    item_tids = list()
+    transaction_count = 0
+    for tid, row in enumerate(data):
+        transaction_count += 1
+        for item in items.encode(row):
+            if item == len(item_tids):
+                item_tids.append([])
+            item_tids[item].append(tid)
+    return items, [tids_to_bitset(tids, transaction_count) for tids in item_tids], transaction_count
+
+def eclat(data, min_support, diffsets='auto', mode='all'):
+    '''MINES FREQUENT ITEMSETS DEPTH-FIRST ON VERTICAL BITSETS (ECLAT / dECLAT)'''
+    ''' 深度优先搜索：每个前缀的等价类中，两两求交得到下一层的等价类，支持度为位集中1的个数 '''
+    ''' diffsets=True时使用dEclat：第二层起保存差集 d(PXY) = d(PY) - d(PX)，支持度 = sup(PX) - |d(PXY)|，'''
+    ''' 稠密数据集上差集远小于事务集；'auto'时在频繁项的平均支持度超过一半时使用差集 '''
+    ''' mode='closed'只返回闭频繁集（CHARM），mode='maximal'只返回极大频繁集，两者都在搜索中剪枝，使用事务集而不是差集 '''
+    ''' 输入与data_from_txt相同，返回值与Apriori解码后的频繁集形状相同：{frozenset(项): 支持度} '''
+    items, bitsets, transaction_count = vertical_database(data)
+    frequent = list()
+    for item, bits in enumerate(bitsets):
+        count = popcount(bits)
+        if float(count) / transaction_count >= min_support:
+            frequent.append((item, bits, count))
+    if diffsets == 'auto':
+        diffsets = bool(frequent) and sum(count for _, _, count in frequent) > 0.5 * transaction_count * len(frequent)
+    frequent.sort(key=lambda entry: entry[2]) #按支持度从小到大排列，可以减少生成的候选集
+
+    if mode in ('closed', 'maximal'):
+        miner = charm if mode == 'closed' else maximal
+        return dict((frozenset(items.decode(itemset)), float(count) / transaction_count)
+                    for itemset, count in miner(frequent, transaction_count, min_support).items())
+    if mode != 'all':
+        raise ValueError('ERROR: MODE MUST BE all, closed OR maximal')
+
+    result = dict()
+
+    def extend(prefix, klass, is_diff):
+        ''' 处理前缀prefix的等价类klass，其中每项为(项编号, 事务集或差集, 计数) '''
+        for index, (item, bits, count) in enumerate(klass):
+            itemset = prefix + (item,)
+            result[frozenset(items.decode(itemset))] = float(count) / transaction_count
+            child = list()
+            for other, other_bits, other_count in klass[index + 1:]:
+                if is_diff:
+                    child_bits = other_bits & ~bits #d(PXY) = d(PY) - d(PX)
+                    child_count = count - popcount(child_bits)
+                elif diffsets:
+                    child_bits = bits & ~other_bits #d(XY) = t(X) - t(Y)
+                    child_count = count - popcount(child_bits)
+                else:
+                    child_bits = bits & other_bits #t(XY) = t(X) ∩ t(Y)
+                    child_count = popcount(child_bits)
+                if float(child_count) / transaction_count >= min_support:
+                    child.append((other, child_bits, child_count))
+            if child:
+                extend(itemset, child, is_diff or diffsets)
+
+    extend((), frequent, False)
+    return result
+
+def charm(frequent, transaction_count, min_support):
+    '''MINES CLOSED FREQUENT ITEMSETS WITH CHARM'''
+    ''' 对等价类中的Xi和Xj比较事务集：t(Xi)=t(Xj)时把Xj并入Xi并删除Xj；t(Xi)⊂t(Xj)时把Xj并入Xi；'''
+    ''' t(Xi)⊃t(Xj)时删除Xj并把Xi∪Xj放入下一层；否则Xi∪Xj频繁时放入下一层 '''
+    ''' 闭项集由其事务集唯一确定，所以用事务集作键判断是否已被找到的闭项集包含 '''
+    closed = dict() #事务集 -> (项集, 计数)
+
+    def extend(klass):
+        index = 0
+        while index < len(klass):
+            items, bits, count = klass[index]
+            child = list()
+            other_index = index + 1
+            while other_index < len(klass):
+                other_items, other_bits, _ = klass[other_index]
+                both = bits & other_bits
+                if both == bits:
+                    items |= other_items #Xj的事务集包含Xi的：Xj属于Xi的闭包
+                    for entry in child:
+                        entry[0] |= other_items
+                    if both == other_bits:
+                        del klass[other_index]
+                        continue
+                elif both == other_bits:
+                    del klass[other_index]
+                    child.append([items | other_items, both, popcount(both)])
+                    continue
+                else:
+                    both_count = popcount(both)
+                    if float(both_count) / transaction_count >= min_support:
+                        child.append([items | other_items, both, both_count])
+                other_index += 1
+            if child:
+                extend(child)
+            previous = closed.get(bits)
+            closed[bits] = (items | previous[0] if previous else items, count)
+            index += 1
+
+    extend([[set([item]), bits, count] for item, bits, count in frequent])
+    return dict((tuple(sorted(items)), count) for items, count in closed.values())
+
+def maximal(frequent, transaction_count, min_support):
+    '''MINES MAXIMAL FREQUENT ITEMSETS DEPTH-FIRST WITH SUPERSET PRUNING'''
+    ''' 前缀P的等价类中所有项并上P若已被某个极大频繁集包含，整个等价类都不用再搜索（前瞻剪枝）；'''
+    ''' 没有频繁扩展且未被包含的项集就是极大频繁集。项集用项编号的位掩码表示，包含判断只需一次位运算 '''
+    found = list() #(项集位掩码, 项集, 计数)
+
+    def subsumed(mask):
+        return any(mask & ~other == 0 for other, _, _ in found)
+
+    def extend(prefix, prefix_mask, klass):
+        for index, (item, bits, count) in enumerate(klass):
+            itemset = prefix + (item,)
+            mask = prefix_mask | (1 << item)
+            rest = klass[index + 1:]
+            tail_mask = mask
+            for other, _, _ in rest:
+                tail_mask |= 1 << other
+            if subsumed(tail_mask):
+                return #后面的项集都是tail_mask的子集
+            child = list()
+            for other, other_bits, _ in rest:
+                child_bits = bits & other_bits
+                child_count = popcount(child_bits)
+                if float(child_count) / transaction_count >= min_support:
+                    child.append((other, child_bits, child_count))
+            if child:
+                child_mask = mask
+                for other, _, _ in child:
+                    child_mask |= 1 << other
+                if not subsumed(child_mask):
+                    extend(itemset, mask, child)
+            elif not subsumed(mask):
+                found.append((mask, itemset, count))
+
+    extend((), 0, frequent)
+    return dict((tuple(sorted(itemset)), count) for _, itemset, count in found)
+
+def main():
+    '''MAIN METHOD'''
+    itemset = eclat(data_from_txt('transactions.txt'), 0.2)
+    print_frequent_itemsets(itemset)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+from array import array
+from collections import namedtuple
+
+class ArrayFPTree(object):
+    '''FP TREE STORED IN PARALLEL ARRAYS INDEXED BY NODE ID'''
+    ''' 紧凑FP树：不为每个节点建立FPNode对象，节点编号作下标，父节点、项标号编码、Count、同项标号链表的下一节点、'''
+    ''' 第一个子节点和下一个兄弟节点分别存放在平行的array中，每个节点只占几十个字节；节点0是根节点 '''
+    ''' 提供与FPTree相同的add、items、nodes和prefix_paths接口，nodes和prefix_paths返回的是只读的Node命名元组 '''
+    ''' 子节点少时沿兄弟链表查找，子节点多的节点（如项标号很多时的根节点）另建{编码: 子节点}字典，每次查找都是O(1) '''
+    Node = namedtuple('Node', 'id item count') #节点的只读视图，只在遍历时临时生成
+    SCAN_LIMIT = 8 #兄弟链表最多查找这么多个节点，超过后为该父节点建立子节点字典
+
+    def __init__(self):
+        ''' 初始化根节点、各平行数组和项标号编码 '''
+        self._parent = array('i', [-1]) #父节点编号
+        self._item = array('i', [-1]) #项标号编码
+        self._count = array('q', [0]) #通过节点的路径的个数（'q'在各平台上都是8字节）
+        self._neighbour = array('i', [-1]) #同项标号链表中的下一节点
+        self._child = array('i', [-1]) #第一个子节点
+        self._sibling = array('i', [-1]) #下一个兄弟节点
+        self._items = [] #编码 -> 项标号
+        self._codes = {} #项标号 -> 编码
+        self._heads = array('i') #每个编码的链表首节点
+        self._tails = array('i') #每个编码的链表尾节点
+        self._lookup = {} #子节点多的父节点编号 -> {编码: 子节点编号}
+
+    def __len__(self):
+        ''' 节点个数（不含根节点）'''
+        return len(self._item) - 1
+
+    def _code(self, item):
+        ''' 返回项标号的编码，第一次出现时分配新编码 '''
+        code = self._codes.get(item)
+        if code is None:
+            code = self._codes[item] = len(self._items)
+            self._items.append(item)
+            self._heads.append(-1)
+            self._tails.append(-1)
+        return code
+
+    def _search(self, parent, code):
+        ''' 查找父节点下给定编码的子节点，没有则返回-1；兄弟链表查找超过SCAN_LIMIT个节点时为父节点建立子节点字典 '''
+        lookup = self._lookup.get(parent)
+        if lookup is not None:
+            return lookup.get(code, -1)
+        child = self._child[parent]
+        steps = 0
+        while child != -1 and self._item[child] != code:
+            child = self._sibling[child]
+            steps += 1
+        if steps > self.SCAN_LIMIT:
+            lookup = self._lookup[parent] = {}
+            node = self._child[parent]
+            while node != -1:
+                lookup[self._item[node]] = node
+                node = self._sibling[node]
+        return child
+
+    def _new_node(self, parent, code):
+        ''' 新建一个节点，插到父节点子节点链表的最前面，并添加到项标号链表的末尾 '''
+        node = len(self._item)
+        self._parent.append(parent)
+        self._item.append(code)
+        self._count.append(0)
+        self._neighbour.append(-1)
+        self._child.append(-1)
+        self._sibling.append(self._child[parent])
+        self._child[parent] = node
+        lookup = self._lookup.get(parent)
+        if lookup is not None:
+            lookup[code] = node
+        tail = self._tails[code]
+        if tail == -1:
+            self._heads[code] = node
+        else:
+            self._neighbour[tail] = node
+        self._tails[code] = node
+        return node
+
+    def add(self, transaction, count=1):
+        '''ADDS A TRANSACTION TO THE TREE'''
+        ''' 向树中添加一个事务（或一条路径），路径上每个节点的Count加count '''
+        self._insert([self._code(item) for item in transaction], count)
+
+    def _insert(self, codes, count):
+        ''' 按编码插入一条路径 '''
+        point = 0
+        for code in codes:
+            next_point = self._search(point, code)
+            if next_point == -1:
+                next_point = self._new_node(point, code)
+            self._count[next_point] += count
+            point = next_point
+
+    def _node(self, node):
+        return self.Node(node, self._items[self._item[node]], self._count[node])
+
+    def items(self):
+        '''GENERATE 2-TUPLES FOR EACH ITEM OF THE FORM (ITEM, GENERATOR)'''
+        ''' 返回一个迭代器，提供项标号和其所有节点的迭代器'''
+        for code, item in enumerate(self._items):
+            if self._heads[code] != -1:
+                yield (item, self.nodes(item))
+
+    def nodes(self, item):
+        '''GENERATES THE SEQUENCE OF NODES THAT CONTAIN THE GIVEN ITEM'''
+        ''' 对于给定的项标号，返回一个枚举其所有节点的迭代器'''
+        code = self._codes.get(item)
+        if code is None:
+            return
+        node = self._heads[code]
+        while node != -1:
+            yield self._node(node)
+            node = self._neighbour[node]
+
+    def prefix_paths(self, item):
+        '''GENERATES PREFIX PATHS ENDING WITH CURRENT ITEM'''
+        ''' 给定一个项标号，返回所有以该标号结尾的路径（从根的下一层到该节点）'''
+
+        def collect_path(node):
+            path = []
+            while node > 0:
+                path.append(self._node(node))
+                node = self._parent[node]
+            path.reverse()
+            return path
+
+        return (collect_path(node.id) for node in self.nodes(item))
+
+    def inspect(self):
+        ''' 输出树（控制台），包括树结构和各项标号及其所有节点'''
+        print('\nTREE:')
+        stack = [(self._child[0], 1)]
+        print('   <root>')
+        while stack:
+            node, depth = stack.pop()
+            if node == -1:
+                continue
+            print('   ' * depth + '%r' % (self._node(node),))
+            stack.append((self._sibling[node], depth))
+            stack.append((self._child[node], depth + 1))
+        print('\nROUTES:')
+        for item, nodes in self.items():
+            print('%r' % item)
+            for node in nodes:
+                print('%r' % (node,))
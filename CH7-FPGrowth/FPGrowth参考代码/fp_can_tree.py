@@ -0,0 +1,82 @@
+import pickle
+import sys
+from array import array
+from collections import defaultdict
+
+from fp_array_tree import ArrayFPTree
+from fp_growth import mine_tree
+
+class CanTree(ArrayFPTree):
+    '''FP TREE WITH A FIXED CANONICAL ITEM ORDER THAT GROWS BATCH BY BATCH'''
+    ''' CanTree：事务中的项标号按规范顺序（第一次出现的先后，即编码顺序）排序后插入，这个顺序与支持度无关，'''
+    ''' 加入新的一批事务时不用调整已有的树；树中保存所有项标号（包括暂时不频繁的），挖掘时再按阈值过滤，'''
+    ''' 所以每批新事务到来后只需add_batch，不用重读历史事务就能按全部数据重新挖掘 '''
+
+    def __init__(self):
+        ''' 初始化空树和已加入的事务个数 '''
+        super(CanTree, self).__init__()
+        self.transaction_count = 0
+
+    def add_batch(self, transactions):
+        '''ADDS A BATCH OF TRANSACTIONS IN CANONICAL ITEM ORDER'''
+        ''' 每个事务去重后按编码排序，排序后相同的事务合并计数，每种只插入一次 '''
+        weights = defaultdict(int)
+        for transaction in transactions:
+            weights[tuple(sorted(set(self._code(item) for item in transaction)))] += 1
+            self.transaction_count += 1
+        for codes, weight in weights.items():
+            self._insert(codes, weight)
+
+    def rank(self):
+        '''RETURNS THE CANONICAL POSITION OF EACH ITEM'''
+        return dict(self._codes)
+
+    def mine(self, minimum_support, include_support=False, **params):
+        '''MINES FREQUENT ITEMSETS OF ALL TRANSACTIONS ADDED SO FAR'''
+        ''' minimum_support是绝对支持度（可以用transaction_count换算），其他参数与mine_tree相同 '''
+        return mine_tree(self, self.rank(), minimum_support, include_support, **params)
+
+    def save(self, filename):
+        '''SAVES THE TREE TO A FILE'''
+        ''' 只保存项标号、事务个数和每个节点的父节点、项标号编码、Count三个数组，链表和子节点关系在读入时重建；'''
+        ''' 同时保存各数组的类型码、元素字节数和字节序，在其他平台上读入时按保存时的格式解码 '''
+        state = {
+            'items': self._items,
+            'transaction_count': self.transaction_count,
+            'byteorder': sys.byteorder,
+        }
+        for name in ('parent', 'item', 'count'):
+            column = getattr(self, '_' + name)
+            state[name] = column.tobytes()
+            state[name + '_type'] = (column.typecode, column.itemsize)
+        with open(filename, 'wb') as file:
+            pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename):
+        '''LOADS A TREE SAVED BY save'''
+        ''' 节点按编号从小到大重新建立：父节点总是先于子节点建立，链表和兄弟节点的顺序都与保存前相同 '''
+        with open(filename, 'rb') as file:
+            state = pickle.load(file)
+        tree = cls()
+        for item in state['items']:
+            tree._code(item)
+        tree.transaction_count = state['transaction_count']
+        parents, codes, counts = (cls._column(state, name) for name in ('parent', 'item', 'count'))
+        for node in range(1, len(parents)):
+            tree._new_node(parents[node], codes[node])
+        tree._count = array('q', counts)
+        return tree
+
+    @staticmethod
+    def _column(state, name):
+        ''' 按保存时的类型码和字节序解码一个数组；类型码相同而元素字节数不同时（如Windows与Linux上的'l'）改用同样字节数的有符号类型码；'''
+        ''' 没有格式信息的旧文件按本机的'i'、'i'、'l'读入 '''
+        typecode, itemsize = state.get(name + '_type', (('l' if name == 'count' else 'i'), None))
+        if itemsize is not None and array(typecode).itemsize != itemsize:
+            typecode = next(code for code in 'bhilq' if array(code).itemsize == itemsize)
+        column = array(typecode)
+        column.frombytes(state[name])
+        if state.get('byteorder', sys.byteorder) != sys.byteorder:
+            column.byteswap()
+        return column
@@ -1,14 +1,43 @@
 import csv
-from collections import defaultdict, namedtuple
+import random
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from heapq import heappush, heappushpop
 from optparse import OptionParser
+from time import perf_counter
 
+from fp_array_tree import ArrayFPTree
 from fp_node import FPNode
 from fp_tree import FPTree
 
 
+def pattern_base(paths):
+    ''' 由追溯路径得到条件模式基：每条路径去掉最后的condition_item节点后的项标号，和最后节点的Count '''
+    return [([node.item for node in path[:-1]], path[-1].count) for path in paths]
+
+def conditional_tree_from_base(base, minimum_support):
+    """Builds a conditional FP-tree from a conditional pattern base."""
+    ''' 投影法：先统计条件模式基中每个项标号的支持度，删去不频繁的项后带着Count一次插入新树，不用再修正Count或逐个删除节点 '''
+    ''' 路径中的项保持原树中的全局顺序（闭频繁集、极大频繁集模式依赖这一顺序），所以只过滤不重排 '''
+    supports = defaultdict(int)
+    for items, count in base:
+        for item in items:
+            supports[item] += count
+
+    tree = FPTree()
+    for items, count in base:
+        tree.add([item for item in items if supports[item] >= minimum_support], count)
+    return tree
+
 def conditional_tree_from_paths(paths, minimum_support):
     """Builds a conditional FP-tree from the given prefix paths."""
-    ''' 使用一个项标号对应的所有追溯路径建立该项标号的一个条件FP树'''
+    ''' 使用一个项标号对应的所有追溯路径建立该项标号的一个条件FP树 '''
+    return conditional_tree_from_base(pattern_base(paths), minimum_support)
+
+def conditional_tree_by_pruning(paths, minimum_support):
+    """Builds a conditional FP-tree from the given prefix paths by pruning a full copy of them."""
+    ''' 原来的做法（保留用于benchmark比较）：使用一个项标号对应的所有追溯路径建立该项标号的一个条件FP树'''
     tree = FPTree() #初始化
     condition_item = None #要为其建立条件FP树的项标号
     items = set() #路径（树）中涉及到的所有项标号
@@ -52,65 +81,382 @@ def conditional_tree_from_paths(paths, minimum_support):
 
     return tree
 
-def find_frequent_itemsets(transactions, minimum_support, include_support=False):
-    '''FINDS FREQUENT ITEMSETS IN THE GIVEN TRANSACTIONS'''
-    ''' 计算频繁集'''
-    
-    items = defaultdict(lambda:0) #每个（经过预处理后）项标号对应的支持度字典（1-项集的支持度字典）
-    processed_transactions = [] #保存预处理后获取的事务集
-
-    ''' 可以预处理下事务集，比如删除某些项编号，排除某些事务等，这里未做任何处理'''
-    for transaction in transactions:        
-        transaction = transaction #transaction[0].split()                   
-        processed = []
-        for item in transaction:
-            items[item] += 1
-            processed.append(item)
-        processed_transactions.append(processed)
-  
-    items = dict((item, support) for item, support in items.items()
-                  if support >= minimum_support) #用阈值筛选出频繁的1-项集
+def single_path(tree):
+    '''RETURNS THE NODES OF THE TREE FROM THE ROOT DOWN IF IT IS A SINGLE PATH, OTHERWISE NONE'''
+    ''' 若树只有一条路径（每个节点至多一个子节点），返回路径上的节点列表（空树返回空列表），否则返回None'''
+    path = []
+    node = tree.root
+    while not node.leaf:
+        children = node.children
+        if len(children) > 1:
+            return None
+        node = children[0]
+        path.append(node)
+    return path
 
-    def clean_transaction(transaction):
-        '''STRIPS TRANSACTIONS OF INFREQUENT ITEMS AND SURVIVING ITEMS ARE SORTED IN DECREASING ORDER OF FREQUENCY'''
-        ''' 按照预处理的结果，自每个事务中删除已经排除的项标号，同时将事务中的每个项标号按照其支持度大小排序（这样构造FP树后，支持度低的都在树的底层，便于修剪'''
-        transaction = list(filter(lambda v: v in items, transaction))         
-        transaction.sort(key=lambda v: items[v], reverse=True)        
-        return transaction
-
-    ''' 构建FP树'''
-    master = FPTree()
-    for transaction in map(clean_transaction, processed_transactions): #对数据进行预处理
-        master.add(transaction) #将事务（路径）逐个添加到FP树
-    # master.inspect()
+def expand_path(path):
+    '''GENERATES EVERY COMBINATION OF THE ITEMS ON A SINGLE PATH WITH ITS SUPPORT'''
+    ''' 单一路径上任意项标号的组合都是频繁的，支持度是组合中最下面节点的Count；'''
+    ''' 按逐层建条件树递归挖掘时的顺序输出：每个节点先单独输出，再依次接在它上面所有组合的后面 '''
+    expanded = []
+    for node in path:
+        block = [[node.item]] + [itemset + [node.item] for itemset in expanded]
+        for itemset in block:
+            yield list(itemset), node.count
+        expanded.extend(block)
 
-    def find_with_suffix(tree, suffix):
-        ''' 后缀法沿树逐层向上寻找频繁项集（注意，这里第一次用的是原始FP树，下层递归就都是用的重新构建的条件FP树了）'''
-        for item, nodes in tree.items(): #对每个项标号处理（注意由于建立FP树时，事务中都是支持度高的项在前面，会优先处理支持度高的项标号）
+def find_with_suffix(tree, suffix, minimum_support, include_support=False):
+    '''GENERATES THE FREQUENT ITEMSETS OF A TREE, EACH ENDING WITH THE GIVEN SUFFIX'''
+    ''' 后缀法沿树逐层向上寻找频繁项集（注意，这里第一次用的是原始FP树，下层就都是用的重新构建的条件FP树了）'''
+    ''' 用显式栈代替递归：栈中每层保存一棵树、其尚未处理的项标号迭代器和后缀，长事务也不会超过递归深度限制；'''
+    ''' 条件FP树只有一条路径时直接展开路径上的所有组合，不再逐层建树。输出的顺序与递归时完全相同 '''
+    stack = [(tree, tree.items(), suffix)]
+    while stack:
+        tree, items, suffix = stack[-1]
+        for item, nodes in items: #对每个项标号处理（注意由于建立FP树时，事务中都是支持度高的项在前面，会优先处理支持度高的项标号）
             support = sum(n.count for n in nodes) #计算该项标号的支持度
             if support >= minimum_support: #如果满足支持度阈值，找到一个频繁集
                 found_set = [item] + suffix
                 yield (found_set, support) if include_support else found_set
 
-                '''Build a conditional tree and recursively search for frequent itemsets within it.'''
                 ''' 从该标号对应的节点继续向上追溯，找出所有路径，构造条件FP树'''
                 cond_tree = conditional_tree_from_paths(tree.prefix_paths(item),
                     minimum_support)
-                ''' 在条件FP树上继续寻找频繁的前缀路径'''
-                for found_suffix in find_with_suffix(cond_tree, found_set):
-                    yield found_suffix
+                path = single_path(cond_tree)
+                if path is None:
+                    ''' 在条件FP树上继续寻找频繁的前缀路径：压栈后从新的树开始处理，处理完再回到本层的下一个项标号'''
+                    stack.append((cond_tree, cond_tree.items(), found_set))
+                    break
+                for itemset, path_support in expand_path(path):
+                    itemset += found_set
+                    yield (itemset, path_support) if include_support else itemset
+        else:
+            stack.pop()
+
+def transactions_from_csv(filename):
+    '''GENERATES THE TRANSACTIONS OF A .csv FILE, ONE ROW PER TRANSACTION'''
+    with open(filename, 'r', newline='') as csvf:
+        for row in csv.reader(csvf):
+            yield row
+
+def build_tree(transactions, minimum_support, compact=False, buffer_size=65536):
+    '''BUILDS THE FP TREE OF THE FREQUENT ITEMS OF THE TRANSACTIONS'''
+    ''' 两遍扫描构建FP树，返回树和每个频繁项标号在全局顺序中的位置（支持度从高到低）：第一遍统计每个项标号的支持度，'''
+    ''' 第二遍把每个事务删去不频繁项并排序，排序后相同的事务合并计数后再插入，不保存全部预处理后的事务副本 '''
+    ''' transactions可以是列表，也可以是每次调用返回一个新迭代器的函数（如partial(transactions_from_csv, 文件名)），'''
+    ''' 这样两遍都直接读文件；只能遍历一次的迭代器（如csv.reader）会先读入一个列表 '''
+    if not callable(transactions) and iter(transactions) is transactions:
+        transactions = list(transactions)
+    scan = transactions if callable(transactions) else partial(iter, transactions)
+
+    items = defaultdict(int) #每个项标号对应的支持度字典（1-项集的支持度字典）
+    for transaction in scan():
+        for item in transaction:
+            items[item] += 1
+    items = dict((item, support) for item, support in items.items()
+                  if support >= minimum_support) #用阈值筛选出频繁的1-项集
+    ''' 支持度相同的项也要在所有事务中保持同一顺序，否则同一项集会被分到不同的条件树中重复输出且支持度被拆分 '''
+    rank = dict((item, index) for index, item in enumerate(sorted(items, key=items.get, reverse=True)))
+
+    def clean_transaction(transaction):
+        '''STRIPS TRANSACTIONS OF INFREQUENT ITEMS AND SURVIVING ITEMS ARE SORTED IN DECREASING ORDER OF FREQUENCY'''
+        ''' 自每个事务中删除不频繁的项标号，同时将事务中的每个项标号按照其支持度大小排序（这样构造FP树后，支持度低的都在树的底层，便于修剪'''
+        transaction = [item for item in transaction if item in items]
+        transaction.sort(key=rank.get)
+        return tuple(transaction)
+
+    ''' 构建FP树：相同的事务先在缓冲字典中合并计数，缓冲中的事务达到buffer_size种时整批插入树中并清空，内存占用有上限；'''
+    ''' 字典保持第一次出现的顺序，按这个顺序插入时各节点建立的先后与逐个插入时相同，挖掘输出的顺序也不变 '''
+    master = ArrayFPTree() if compact else FPTree()
+    weights = defaultdict(int)
+
+    def flush():
+        for transaction, weight in weights.items():
+            master.add(transaction, weight) #将事务（路径）带着出现次数添加到FP树
+        weights.clear()
+
+    for transaction in scan():
+        weights[clean_transaction(transaction)] += 1
+        if len(weights) >= buffer_size:
+            flush()
+    flush()
+    return master, rank
+
+_item_names = None
+_mining_support = None
+
+def init_mining(names, minimum_support):
+    '''STORES THE ITEM NAMES AND THE MINIMUM SUPPORT OF A MINING WORKER'''
+    global _item_names, _mining_support
+    _item_names, _mining_support = names, minimum_support
+
+def mine_pattern_bases(group):
+    '''MINES THE CONDITIONAL PATTERN BASES OF ONE GROUP OF TOP-LEVEL ITEMS'''
+    ''' group中每项为(项标号的全局序号, 用全局序号编码的条件模式基)，返回每个项标号的条件树中找到的所有(频繁集, 支持度) '''
+    names = _item_names
+    results = []
+    for index, base in group:
+        base = [([names[item] for item in items], count) for items, count in base]
+        tree = conditional_tree_from_base(base, _mining_support)
+        results.append((index, list(find_with_suffix(tree, [names[index]], _mining_support, True))))
+    return results
+
+def find_in_parallel(master, rank, minimum_support, include_support, n_jobs):
+    '''MINES THE CONDITIONAL TREES OF THE TOP-LEVEL ITEMS ON A PROCESS POOL'''
+    ''' 原始FP树中各个项标号的条件树互不相关，可以分给不同的进程挖掘。先以项标号在树中的节点个数估计其子树的挖掘量，'''
+    ''' 从大到小依次放入当前总量最小的组（共4*n_jobs组），总量大的组先提交；每组在提交时才取出其中各项标号的条件模式基，'''
+    ''' 用全局序号编码成整数列表发给工作进程，同时在途的组不超过2*n_jobs个，父进程的内存占用接近原始FP树的大小；'''
+    ''' 结果按串行时项标号的顺序合并，等待的项标号所在的组还没有提交时先依次提交到该组，输出与串行完全相同 '''
+    names = sorted(rank, key=rank.get)
+    order = list() #(项标号的全局序号, 支持度)，串行挖掘时的顺序
+    sizes = dict() #项标号的全局序号 -> 节点个数
+    for item, nodes in master.items():
+        support = size = 0
+        for node in nodes:
+            support += node.count
+            size += 1
+        if support >= minimum_support:
+            order.append((rank[item], support))
+            sizes[rank[item]] = size
+    groups = [([], [0]) for _ in range(min(len(order), 4 * n_jobs))]
+    for index in sorted(sizes, key=sizes.get, reverse=True):
+        group, load = min(groups, key=lambda entry: entry[1][0])
+        group.append(index)
+        load[0] += sizes[index]
+    pending = deque(group for group, _ in sorted(groups, key=lambda entry: entry[1][0], reverse=True))
+
+    def encoded_base(index):
+        return [([rank[node.item] for node in path[:-1]], path[-1].count)
+                for path in master.prefix_paths(names[index])]
+
+    with ProcessPoolExecutor(n_jobs, initializer=init_mining, initargs=(names, minimum_support)) as pool:
+        futures = dict()
+        running = set()
+
+        def submit():
+            if len(running) >= 2 * n_jobs:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                running.difference_update(done)
+            group = pending.popleft()
+            future = pool.submit(mine_pattern_bases, [(index, encoded_base(index)) for index in group])
+            running.add(future)
+            for index in group:
+                futures[index] = future
+
+        finished = dict()
+        for index, support in order:
+            running.difference_update([future for future in running if future.done()])
+            while pending and len(running) < 2 * n_jobs:
+                submit()
+            while index not in futures:
+                submit()
+            found_set = [names[index]]
+            yield (found_set, support) if include_support else found_set
+            future = futures.pop(index)
+            if index not in finished:
+                finished.update(future.result())
+            for itemset, itemset_support in finished.pop(index):
+                yield (itemset, itemset_support) if include_support else itemset
+
+def find_frequent_itemsets(transactions, minimum_support, include_support=False, mode='all', compact=False, n_jobs=1,
+                           top_k=None, min_length=1):
+    '''FINDS FREQUENT ITEMSETS IN THE GIVEN TRANSACTIONS'''
+    ''' 计算频繁集：先构建FP树，再用mine_tree挖掘（各个参数见mine_tree）'''
+    ''' transactions也可以是每次调用返回一个新迭代器的函数，两遍扫描都直接读数据源（见build_tree）'''
+    ''' compact=True时原始FP树使用数组存储的ArrayFPTree，大数据集上内存只有FPNode对象树的一小部分'''
+    master, rank = build_tree(transactions, minimum_support, compact)
+    # master.inspect()
+    for itemset in mine_tree(master, rank, minimum_support, include_support, mode, n_jobs, top_k, min_length):
+        yield itemset
+
+def mine_tree(master, rank, minimum_support, include_support=False, mode='all', n_jobs=1, top_k=None, min_length=1):
+    '''MINES FREQUENT ITEMSETS FROM A BUILT FP TREE'''
+    ''' rank是每个项标号在树中路径上的顺序（越小越靠近根），树中可以有不频繁的项标号，挖掘时按minimum_support过滤 '''
+    ''' mode='closed'只输出闭频繁集（FPClose），mode='maximal'只输出极大频繁集（FPMax），两者都在搜索中剪枝'''
+    ''' n_jobs > 1时原始FP树中各个项标号的条件树分给n_jobs个进程挖掘，输出与串行完全相同；闭频繁集、极大频繁集需要全局剪枝，只能串行'''
+    ''' top_k给定时只输出支持度最高的top_k个长度不小于min_length的频繁集（与第top_k个支持度相同的也一并输出），按支持度从高到低排列；'''
+    ''' 此时minimum_support只是初始的下限（可以取1），挖掘过程中按已找到的第top_k大的支持度动态提高 '''
+    if mode not in ('all', 'closed', 'maximal'):
+        raise ValueError('ERROR: MODE MUST BE all, closed OR maximal')
+    if n_jobs > 1 and mode != 'all':
+        raise ValueError('ERROR: n_jobs > 1 ONLY SUPPORTS mode all')
+    if top_k is not None and (mode != 'all' or n_jobs > 1):
+        raise ValueError('ERROR: top_k ONLY SUPPORTS mode all WITH n_jobs = 1')
+
+    def frequent_items(tree):
+        ''' 树中每个频繁项标号的支持度，按支持度从低到高（全局顺序的逆序）排列，自下而上处理时更早找到的项集更大 '''
+        supports = {}
+        for item, nodes in tree.items():
+            support = sum(n.count for n in nodes)
+            if support >= minimum_support:
+                supports[item] = support
+        return sorted(supports.items(), key=lambda entry: rank[entry[0]], reverse=True)
+
+    def result(itemset, support):
+        found_set = sorted(itemset, key=rank.get)
+        return (found_set, support) if include_support else found_set
+
+    def find_maximal(tree, suffix, found):
+        ''' FPMax：head并上条件树中所有频繁项后若已被找到的极大频繁集包含，整棵条件树都不用再搜索；'''
+        ''' 条件树为单一路径（或为空）时head并上整条路径就是极大频繁集。与find_with_suffix一样用显式栈遍历 '''
+        stack = [(tree, iter(frequent_items(tree)), suffix)]
+        while stack:
+            tree, items, suffix = stack[-1]
+            for item, support in items:
+                head = suffix | frozenset([item])
+                cond_tree = conditional_tree_from_paths(tree.prefix_paths(item), minimum_support)
+                tail = frequent_items(cond_tree)
+                candidate = head.union(tail_item for tail_item, _ in tail)
+                if any(candidate <= other for other in found):
+                    continue
+                path = single_path(cond_tree)
+                if path is None:
+                    stack.append((cond_tree, iter(tail), head))
+                    break
+                head = head.union(node.item for node in path)
+                found.append(head)
+                yield result(head, path[-1].count if path else support)
+            else:
+                stack.pop()
+
+    def find_closed(tree, suffix, found):
+        ''' FPClose：条件树中支持度与head相同的项一定属于head的闭包，直接并入head；'''
+        ''' 并入后若已被支持度相同的闭频繁集包含，整棵条件树中的闭频繁集都已找到。与find_with_suffix一样用显式栈遍历 '''
+        stack = [(tree, iter(frequent_items(tree)), suffix)]
+        while stack:
+            tree, items, suffix = stack[-1]
+            for item, support in items:
+                if item in suffix:
+                    continue #已并入后缀的闭包项，其条件树中的项集都会在其他项的条件树中找到
+                cond_tree = conditional_tree_from_paths(tree.prefix_paths(item), minimum_support)
+                tail = frequent_items(cond_tree)
+                head = suffix.union([item], (tail_item for tail_item, tail_support in tail if tail_support == support))
+                if any(head <= other for other in found.get(support, ())):
+                    continue
+                found.setdefault(support, []).append(head)
+                yield result(head, support)
+                if any(tail_support < support for _, tail_support in tail):
+                    stack.append((cond_tree, iter(tail), head))
+                    break
+            else:
+                stack.pop()
+
+    def find_top_k(tree, suffix):
+        ''' top-k：找到top_k个长度不小于min_length的项集后，阈值提高到其中第top_k大的支持度，之后建立的条件树直接按新阈值剪枝；'''
+        ''' 每棵树中的项标号按支持度从高到低处理，使阈值尽快提高，遇到低于阈值的项标号时这棵树中剩下的都可以跳过 '''
+        best = [] #当前最好的top_k个支持度（小顶堆），堆顶就是第top_k大的支持度
+        found = [] #(项集, 支持度)
+
+        def threshold():
+            return max(minimum_support, best[0]) if len(best) == top_k else minimum_support
+
+        def items_by_support(tree):
+            supports = [(item, sum(n.count for n in nodes)) for item, nodes in tree.items()]
+            supports.sort(key=lambda entry: entry[1], reverse=True)
+            return iter(supports)
+
+        stack = [(tree, items_by_support(tree), suffix)]
+        while stack:
+            tree, items, suffix = stack[-1]
+            entry = next(items, None)
+            if entry is None or entry[1] < threshold():
+                stack.pop()
+                continue
+            item, support = entry
+            found_set = [item] + suffix
+            if len(found_set) >= min_length:
+                found.append((found_set, support))
+                if len(best) < top_k:
+                    heappush(best, support)
+                else:
+                    heappushpop(best, support)
+                if len(found) > 4 * top_k: #丢掉已经低于阈值的项集，保存的项集数有上限
+                    found = [entry for entry in found if entry[1] >= threshold()]
+            cond_tree = conditional_tree_from_paths(tree.prefix_paths(item), threshold())
+            cond_items = items_by_support(cond_tree)
+            if len(found_set) + len(list(cond_tree.items())) >= min_length: #条件树中的项全部加上也达不到min_length时不用再搜索
+                stack.append((cond_tree, cond_items, found_set))
+
+        limit = threshold()
+        found = [entry for entry in found if entry[1] >= limit]
+        found.sort(key=lambda entry: entry[1], reverse=True)
+        for found_set, support in found:
+            yield (found_set, support) if include_support else found_set
 
     '''Search for frequent itemsets, and yield the results we find.'''
     ''' 搜索频繁集并返回迭代器'''
-    for itemset in find_with_suffix(master, []):
+    if top_k is not None:
+        search = find_top_k(master, [])
+    elif mode == 'maximal':
+        search = find_maximal(master, frozenset(), [])
+    elif mode == 'closed':
+        search = find_closed(master, frozenset(), {})
+    elif n_jobs > 1:
+        search = find_in_parallel(master, rank, minimum_support, include_support, n_jobs)
+    else:
+        search = find_with_suffix(master, [], minimum_support, include_support)
+    for itemset in search:
         yield itemset
 
+def skewed_transactions(filename, transaction_count=20000, item_count=500, length=30, seed=0):
+    '''WRITES A CSV OF TRANSACTIONS WHOSE ITEM FREQUENCIES FOLLOW A ZIPF-LIKE LAW'''
+    ''' 第r个项标号被抽中的权重为1/(r+1)：少数项出现在大多数事务中，大量项只出现在少数事务中，'''
+    ''' 条件树中会有很长的同项标号链表，又要剪掉大量不频繁的节点 '''
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(item_count)]
+    with open(filename, 'w', newline='') as csvf:
+        writer = csv.writer(csvf)
+        for _ in range(transaction_count):
+            writer.writerow(sorted(set('i%d' % item for item in rng.choices(range(item_count), weights, k=length))))
+
+def tree_patterns(tree):
+    ''' 树中所有(路径项标号, 最后节点Count)，排序后可以比较两棵树表示的事务是否相同 '''
+    return sorted((tuple(node.item for node in path), path[-1].count)
+                  for item, _ in tree.items() for path in tree.prefix_paths(item))
+
+def benchmark(filename, minimum_support, repeat=1):
+    '''TIMES BUILDING THE CONDITIONAL TREES OF ALL FREQUENT ITEMS WITH EACH CONSTRUCTION'''
+    ''' 对原始FP树中每个频繁项标号建立条件FP树，比较三种做法的耗时，并检查得到的条件树完全相同：'''
+    ''' 原来的建整棵树后剪枝、从链表头查找前一个节点（模拟旧的_removed）；建树后剪枝、双向链表O(1)删除；投影法一次插入 '''
+    master, rank = build_tree(partial(transactions_from_csv, filename), minimum_support)
+    removed = FPTree._removed
+
+    def removed_by_walk(tree, node_to_remove):
+        for node in tree.nodes(node_to_remove.item):
+            if node is node_to_remove or node.neighbour is node_to_remove:
+                break
+        removed(tree, node_to_remove)
+
+    strategies = (('pruning, linear removal', conditional_tree_by_pruning, removed_by_walk),
+                  ('pruning, doubly linked', conditional_tree_by_pruning, removed),
+                  ('projection', conditional_tree_from_paths, removed))
+    timings = {}
+    reference = None
+    try:
+        for name, build, method in strategies:
+            FPTree._removed = method
+            best = None
+            for _ in range(repeat):
+                start = perf_counter()
+                trees = [build(master.prefix_paths(item), minimum_support) for item in rank]
+                elapsed = perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            patterns = [tree_patterns(tree) for tree in trees]
+            if reference is None:
+                reference = patterns
+            elif patterns != reference:
+                raise AssertionError('ERROR: %s GAVE DIFFERENT CONDITIONAL TREES' % name)
+    finally:
+        FPTree._removed = removed
+    baseline = timings[strategies[0][0]]
+    print('construction\tseconds\tspeedup')
+    for name, _, _ in strategies:
+        print('%s\t%.3f\t%.2fx' % (name, timings[name], baseline / timings[name]))
+
 if __name__ == '__main__':
-    data = []
-    with open('data/transaction.csv','r') as csvf:
-        lines = csv.reader(csvf)
-        data = list(lines)    
-    minsup = 2
-    ffi = find_frequent_itemsets(data, minsup, True)    
+    data = partial(transactions_from_csv, 'data/transaction.csv') #两遍扫描都直接读文件
+    topk = 10 #不用反复尝试minsup，直接取支持度最高的10个频繁集（最小支持度在挖掘中自动提高）
+    ffi = find_frequent_itemsets(data, 1, True, top_k=topk)
     for itemset, support in ffi:
         print('{' + ', '.join(itemset) + '} ' + str(support))
@@ -9,6 +9,7 @@ class FPNode(object):
         self._parent = None #节点的父节点（对树的根节点，总为None）
         self._children = {} # 包含各子节点的字典
         self._neighbour = None # 链接的下一个节点（用于每个item节点链表的跟踪指针）
+        self._previous = None # 链接的上一个节点（双向链表，删除节点时不用从头查找前一个节点）
 
     def __repr__(self):
         if self.root:
@@ -46,17 +47,27 @@ class FPNode(object):
                 child.parent = None #设置被删除的子节点父节点为空
                 self._tree._removed(child) #同时从item链中删除该节点
                 for sub_child in child.children: #处理被删除子节点的各个子节点，将其转移到当前节点中
-                    try:
-                        self._children[sub_child.item]._count += sub_child.count #如果该节点标号在当前节点的子节点中存在，直接将其Count加到当前节点的子节点里
-                        sub_child.parent = None #节点父节点置空
-                    except KeyError:
-                        self.add(sub_child) #否则，将该节点添加为当前节点的子节点
+                    self._merge(sub_child)
                 child._children = {} #清空被删除子节点的子节点字典
             else:
                 raise ValueError('ERROR: CHILD TO BE REMOVED IS NOT THE CHILD OF THIS NODE')
-        except:
+        except KeyError:
             raise ValueError('ERROR: CHILD TO BE REMOVED IS NOT THE CHILD OF THIS NODE')
 
+    def _merge(self, node):
+        '''MERGES A DETACHED SUBTREE INTO THE CHILDREN OF CURRENT NODE'''
+        ''' 若当前节点已有该标号的子节点，把node的Count加到该子节点上，node从项标号链表中删除，其子树递归合并；否则直接添加为子节点 '''
+        existing = self.search(node.item)
+        if existing is None:
+            self.add(node)
+            return
+        existing._count += node.count
+        node.parent = None
+        self._tree._removed(node)
+        for sub_child in node.children:
+            existing._merge(sub_child)
+        node._children = {}
+
     def __contains__(self, item):
         ''' 是否包含特定项标号的子节点'''
         return item in self._children 
@@ -79,12 +90,12 @@ class FPNode(object):
         ''' 返回经过节点的路径条数'''
         return self._count 
 
-    def increment(self):
+    def increment(self, count=1):
         '''INCREMENTS THE COUNT OF CURRENT NODE\'S ITEM'''
-        ''' 路径条数+1'''
+        ''' 路径条数+count（默认+1）'''
         if self._count is None:
             raise ValueError('ERROR: ROOT NODE HAS NO COUNT')
-        self._count += 1 
+        self._count += count
     
     @property
     def root(self):
@@ -123,6 +134,19 @@ class FPNode(object):
             self._neighbour = value
         return locals()
     neighbour = property(**neighbour())
+
+    def previous():
+        ''' 链接的上一个节点的获取和设置'''
+        def fget(self):
+            return self._previous
+        def fset(self, value):
+            if value is not None and not isinstance(value, FPNode):
+                raise TypeError('ERROR: A NODE MUST HAVE AN FP NODE AS A PREVIOUS NEIGHBOUR')
+            if value and value.tree is not self.tree:
+                raise ValueError('ERROR: NODE OF ONE TREE CANNOT HAVE PREVIOUS NEIGHBOUR FROM ANOTHER TREE')
+            self._previous = value
+        return locals()
+    previous = property(**previous())
                 
     @property
     def children(self):
@@ -17,16 +17,16 @@ class FPTree(object):
         ''' 返回根节点'''
         return self._root
 
-    def add(self, transaction):
+    def add(self, transaction, count=1):
         '''ADDS A TRANSACTION TO THE TREE'''
-        ''' 向树中添加一个事务（或一条路径）'''
+        ''' 向树中添加一个事务（或一条路径），路径上每个节点的Count加count（默认为1，条件模式基中的路径带有自己的Count）'''
         point = self._root #从根节点开始
         for item in transaction: #按事务中的项排序沿树逐层向下查找
             next_point = point.search(item) 
             if next_point: #父节点的子节点字典中以前已经建立了该项标号的子节点 
-                next_point.increment() #直接给找到的子节点计数+1
+                next_point.increment(count) #直接给找到的子节点计数+count
             else:
-                next_point = FPNode(self, item) #否则新建一个节点（count默认为1）
+                next_point = FPNode(self, item, count) #否则新建一个节点
                 point.add(next_point) #添加为父节点的一个子节点
                 self._update_route(next_point) #添加到相应项标号的节点链表中
             point = next_point #向下移动到当前节点，继续处理下一层的节点
@@ -39,6 +39,7 @@ class FPTree(object):
         try:
             route = self._routes[point.item] #如果项标号对应的列表已经存在（建立过）
             route[1].neighbour = point #将新节点链接到尾节点（作为尾节点的下一个）
+            point.previous = route[1] #尾节点作为新节点的上一个
             self._routes[point.item] = self.Route(route[0], point) #修正尾节点为刚添加的节点 
         except KeyError:
             self._routes[point.item] = self.Route(point, point) #如果没有建立过，新建项编号的链表，首尾节点引用都是当前添加的节点
@@ -87,18 +88,20 @@ class FPTree(object):
 
     def _removed(self, node_to_remove):
         '''PERFORMS CLEANUP DURING REMOVAL OF A NODE'''
-        ''' 自项标号链表中删除一个节点'''
+        ''' 自项标号链表中删除一个节点：链表是双向的，直接把前后两个节点连起来，不用从头查找前一个节点'''
+        ''' 被删除节点的neighbour保持不变，这样正在用nodes()遍历并删除节点时仍能继续向后遍历'''
         head, tail = self._routes[node_to_remove.item] #获取链表的首节点和尾节点
-        if node_to_remove is head: #如果要删除的节点是首节点
-            if node_to_remove is tail or not node_to_remove.neighbour: #如果只有一个节点
-                # It was the sole node.
-                del self._routes[node_to_remove.item] #直接从字典中删除该项标号及其链表
-            else:
-                self._routes[node_to_remove.item] = self.Route(node_to_remove.neighbour, tail) #否则修正命名元组中的首节点
-        else: #如果要删除的不是首节点
-            for node in self.nodes(node_to_remove.item):
-                if node.neighbour is node_to_remove: #找到其前一个节点
-                    node.neighbour = node_to_remove.neighbour # skip over #修改前一个节点的neibour指针
-                    if node_to_remove is tail: 
-                        self._routes[node_to_remove.item] = self.Route(head, node) #如果删除的是尾节点，修正命名元组中的尾节点
-                    break
+        previous, neighbour = node_to_remove.previous, node_to_remove.neighbour
+        if previous is None: #如果要删除的节点是首节点
+            head = neighbour
+        else:
+            previous.neighbour = neighbour #修改前一个节点的neighbour指针
+        if neighbour is None: #如果要删除的节点是尾节点
+            tail = previous
+        else:
+            neighbour.previous = previous
+        node_to_remove.previous = None
+        if head is None: #如果只有一个节点，直接从字典中删除该项标号及其链表
+            del self._routes[node_to_remove.item]
+        else:
+            self._routes[node_to_remove.item] = self.Route(head, tail)
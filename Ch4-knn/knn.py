@@ -1,4 +1,11 @@
+import copy
 import csv
+import heapq
+import itertools
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 import random
 import math
 import operator
@@ -7,16 +14,64 @@ import numpy as np
 def loadDataset(filename, split, trainingSet=[], testSet=[]):
 	with open(filename, 'r') as csvfile:
 		lines = csv.reader(csvfile)
-		dataset = list(lines)
-		for x in range(len(dataset)-1):
-			for y in range(np.array(dataset).shape[1]):
-				dataset[x][y] = float(dataset[x][y])
+		for row in lines:
+			if not ''.join(row).strip():
+				continue
+			row = [float(v) for v in row]
 			if random.random() < split:
-				trainingSet.append(dataset[x])
+				trainingSet.append(row)
 			else:
-				testSet.append(dataset[x])
- 
+				testSet.append(row)
  
+def loadArray(filename, split, dtype=np.float64, chunkSize=65536, seed=None, cache=True, returnIndices=False):
+	'''Loads a numeric CSV into (trainArray, testArray).
+
+	Rows are parsed chunkSize lines at a time straight into a preallocated
+	array, and the split is one seeded random mask over all rows. With cache
+	the parsed array is saved next to the CSV as <name>.<dtype>.npy and later
+	runs memory-map that copy instead of parsing again. The two halves are
+	copies, so they are read into memory in full; with returnIndices the
+	result is (data, trainRows, testRows) instead, data being the memory-mapped
+	array and the row index arrays selecting each half without copying it.
+	'''
+	data = None
+	cachePath = '%s.%s.npy' % (os.path.splitext(filename)[0], np.dtype(dtype).name)
+	if cache and os.path.exists(cachePath) and os.path.getmtime(cachePath) >= os.path.getmtime(filename):
+		data = np.load(cachePath, mmap_mode='r')
+		if data.dtype != dtype:
+			data = None
+	if data is None:
+		data = _parseCsv(filename, dtype, chunkSize)
+		if cache:
+			tmpPath = cachePath + '.tmp'
+			with open(tmpPath, 'wb') as f:
+				np.save(f, data)
+			os.replace(tmpPath, cachePath)
+			data = np.load(cachePath, mmap_mode='r')
+	mask = np.random.default_rng(seed).random(data.shape[0]) < split
+	if returnIndices:
+		return data, np.nonzero(mask)[0], np.nonzero(~mask)[0]
+	return data[mask], data[~mask]
+
+def _parseCsv(filename, dtype, chunkSize):
+	with open(filename, 'r') as csvfile:
+		rows = 0
+		width = None
+		for line in csvfile:
+			if line.strip():
+				rows += 1
+				if width is None:
+					width = line.count(',') + 1
+		data = np.empty((rows, width or 0), dtype=dtype)
+		csvfile.seek(0)
+		lines = (line for line in csvfile if line.strip())
+		start = 0
+		while start < rows:
+			chunk = list(itertools.islice(lines, chunkSize))
+			data[start:start + len(chunk)] = np.loadtxt(chunk, delimiter=',', dtype=dtype, ndmin=2)
+			start += len(chunk)
+	return data
+
 def euclideanDistance(instance1, instance2, length):
 	distance = 0
 	for x in range(length):
@@ -35,6 +90,253 @@ def getNeighbors(trainingSet, testInstance, k):
 		neighbors.append(distances[x][0])
 	return neighbors
  
+class _BinaryTree(object):
+	'''Space-partitioning tree shared by KDTree and BallTree.
+
+	Nodes live in flat arrays (start, end, left, right) over a permutation of
+	the row indices, so a built tree is plain data and pickles cheaply.
+	Subclasses only differ in the lower bound they keep for each node.
+	'''
+	def __init__(self, data, leafSize=40):
+		self.data = np.ascontiguousarray(data, dtype=np.float64)
+		self.leafSize = max(1, leafSize)
+		self.idx = np.arange(self.data.shape[0])
+		nodes = []
+		stack = [(0, self.data.shape[0], -1, 0)]
+		while stack:
+			start, end, parent, side = stack.pop()
+			node = len(nodes)
+			nodes.append([start, end, -1, -1])
+			if parent >= 0:
+				nodes[parent][2 + side] = node
+			if end - start <= self.leafSize:
+				continue
+			# split at the median of the widest dimension
+			ids = self.idx[start:end]
+			pts = self.data[ids]
+			dim = np.argmax(pts.max(0) - pts.min(0))
+			mid = (end - start) // 2
+			self.idx[start:end] = ids[np.argpartition(pts[:, dim], mid)]
+			stack.append((start + mid, end, node, 1))
+			stack.append((start, start + mid, node, 0))
+		nodes = np.array(nodes, dtype=np.intp).reshape(-1, 4)
+		self.start, self.end, self.left, self.right = nodes.T.copy()
+		if self.data.shape[0]:
+			self._buildBounds()
+
+	def query(self, x, k, alive=None):
+		'''returns (distances, indices) of the k nearest rows to x, nearest first;
+		rows whose entry in the boolean mask alive is False are skipped'''
+		if not self.data.shape[0]:
+			return _sortedHits([])
+		x = np.asarray(x, dtype=np.float64)
+		heap = []  # (-squared distance, -index): the worst neighbour sits on top
+		stack = [(self._lowerBound(0, x), 0)]
+		while stack:
+			bound, node = stack.pop()
+			if len(heap) == k and bound > -heap[0][0]:
+				continue
+			if self.left[node] < 0:
+				ids = self.idx[self.start[node]:self.end[node]]
+				if alive is not None:
+					ids = ids[alive[ids]]
+				dist = _squaredDistances(x[None], self.data[ids])[0]
+				for d, i in zip(dist.tolist(), ids.tolist()):
+					if len(heap) < k:
+						heapq.heappush(heap, (-d, -i))
+					elif (-d, -i) > heap[0]:
+						heapq.heapreplace(heap, (-d, -i))
+				continue
+			children = [(self._lowerBound(c, x), c) for c in (self.left[node], self.right[node])]
+			children.sort(reverse=True)
+			stack.extend(children)
+		heap.sort(reverse=True)
+		return (np.sqrt([-d for d, _ in heap]), np.array([-i for _, i in heap], dtype=np.intp))
+
+	def queryRadius(self, x, r, alive=None):
+		'''returns (distances, indices) of all rows within distance r of x, nearest first'''
+		if not self.data.shape[0]:
+			return _sortedHits([])
+		x = np.asarray(x, dtype=np.float64)
+		r2 = r * r
+		found = []
+		stack = [0]
+		while stack:
+			node = stack.pop()
+			if self._lowerBound(node, x) > r2:
+				continue
+			if self.left[node] < 0:
+				ids = self.idx[self.start[node]:self.end[node]]
+				if alive is not None:
+					ids = ids[alive[ids]]
+				dist = _squaredDistances(x[None], self.data[ids])[0]
+				keep = dist <= r2
+				found.append((dist[keep], ids[keep]))
+			else:
+				stack.extend((self.left[node], self.right[node]))
+		return _sortedHits(found)
+
+class KDTree(_BinaryTree):
+	'''KD-tree: each node keeps the bounding box of its rows'''
+	def _buildBounds(self):
+		self.lower = np.array([self.data[self.idx[s:e]].min(0) for s, e in zip(self.start, self.end)])
+		self.upper = np.array([self.data[self.idx[s:e]].max(0) for s, e in zip(self.start, self.end)])
+
+	def _lowerBound(self, node, x):
+		gap = np.maximum(self.lower[node] - x, 0) + np.maximum(x - self.upper[node], 0)
+		return float(gap.dot(gap)) * (1 - 1e-12)
+
+class BallTree(_BinaryTree):
+	'''Ball tree: each node keeps the centroid and radius of its rows'''
+	def _buildBounds(self):
+		self.centers = np.array([self.data[self.idx[s:e]].mean(0) for s, e in zip(self.start, self.end)])
+		self.radii = np.array([np.sqrt(_squaredDistances(c[None], self.data[self.idx[s:e]]).max())
+			for c, s, e in zip(self.centers, self.start, self.end)])
+
+	def _lowerBound(self, node, x):
+		diff = x - self.centers[node]
+		gap = max(math.sqrt(diff.dot(diff)) - self.radii[node], 0.0)
+		return gap * gap * (1 - 1e-12)
+
+class RPForest(object):
+	'''Approximate neighbour index: a forest of random-projection trees.
+
+	Each tree splits its rows by the hyperplane halfway between two random
+	rows. A query walks all trees best-first by distance to the splitting
+	planes until searchK candidates are gathered, then re-ranks them exactly.
+	More trees or a larger searchK raise recall at the cost of query time.
+	'''
+	def __init__(self, data, nTrees=10, leafSize=40, searchK=None, seed=None):
+		self.data = np.ascontiguousarray(data, dtype=np.float64)
+		self.leafSize = max(1, leafSize)
+		self.searchK = searchK if searchK is not None else nTrees * self.leafSize
+		rng = np.random.default_rng(seed)
+		n = self.data.shape[0]
+		normals, offsets, nodes, leaves = [], [], [], []
+		leafOffset = 0
+		self.roots = []
+		for _ in range(nTrees):
+			self.roots.append(len(nodes))
+			stack = [(np.arange(n), -1, 0)]
+			while stack:
+				ids, parent, side = stack.pop()
+				node = len(nodes)
+				nodes.append([-1, -1, -1, -1])
+				normals.append(np.zeros(self.data.shape[1]))
+				offsets.append(0.0)
+				if parent >= 0:
+					nodes[parent][side] = node
+				if len(ids) <= self.leafSize:
+					nodes[node][2:] = [leafOffset, len(ids)]
+					leaves.append(ids)
+					leafOffset += len(ids)
+					continue
+				a, b = self.data[rng.choice(ids, 2, replace=False)]
+				w = a - b
+				proj = self.data[ids].dot(w)
+				offset = w.dot(a + b) / 2
+				right = proj > offset
+				if right.all() or not right.any():
+					# duplicate rows: no plane separates them, split at random
+					right = np.zeros(len(ids), dtype=bool)
+					right[rng.permutation(len(ids))[:len(ids) // 2]] = True
+					w, offset = np.zeros_like(w), 0.0
+				normals[node], offsets[node] = w, offset
+				stack.append((ids[right], node, 1))
+				stack.append((ids[~right], node, 0))
+		self.normals = np.array(normals)
+		self.offsets = np.array(offsets)
+		self.left, self.right, self.leafStart, self.leafLen = np.array(nodes, dtype=np.intp).T.copy()
+		self.leafIds = np.concatenate(leaves) if leaves else np.empty(0, dtype=np.intp)
+
+	def candidates(self, x, need=None, alive=None):
+		'''live row indices gathered from the leaves closest to x across all trees
+
+		Leaves are taken until need distinct live rows are found (searchK by
+		default) or every leaf has been visited; rows repeated across trees and
+		rows masked out by alive do not count towards need.
+		'''
+		need = self.searchK if need is None else need
+		heap = [(-np.inf, root) for root in self.roots]
+		found, count = [], 0
+		while heap:
+			if count >= need:
+				ids = self._distinct(found, alive)
+				if len(ids) >= need:
+					return ids
+				count = len(ids)
+			priority, node = heapq.heappop(heap)
+			while self.left[node] >= 0:
+				margin = float(self.normals[node].dot(x) - self.offsets[node])
+				near, far = (self.right[node], self.left[node]) if margin > 0 else (self.left[node], self.right[node])
+				heapq.heappush(heap, (max(priority, abs(margin)), far))
+				node = near
+			start = self.leafStart[node]
+			leaf = self.leafIds[start:start + self.leafLen[node]]
+			found.append(leaf)
+			count += len(leaf) if alive is None else int(alive[leaf].sum())
+		return self._distinct(found, alive)
+
+	@staticmethod
+	def _distinct(found, alive):
+		ids = np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.intp)
+		return ids if alive is None else ids[alive[ids]]
+
+	def query(self, x, k, alive=None):
+		x = np.asarray(x, dtype=np.float64)
+		ids = self.candidates(x, max(self.searchK, k), alive)
+		if len(ids) < k:
+			# the forest holds fewer than k live rows near x: scan them all
+			ids = np.arange(self.data.shape[0]) if alive is None else np.nonzero(alive)[0]
+		dist = _squaredDistances(x[None], self.data[ids])[0]
+		order = np.lexsort((ids, dist))[:k]
+		return np.sqrt(dist[order]), ids[order]
+
+class BruteIndex(object):
+	'''Linear scan with the same query interface as the trees'''
+	def __init__(self, data):
+		self.data = np.ascontiguousarray(data, dtype=np.float64)
+
+	def query(self, x, k, alive=None):
+		ids = np.arange(self.data.shape[0]) if alive is None else np.nonzero(alive)[0]
+		dist = _squaredDistances(np.asarray(x, dtype=np.float64)[None], self.data[ids])[0]
+		ind = np.argsort(dist, kind='stable')[:k]
+		return np.sqrt(dist[ind]), ids[ind]
+
+	def queryRadius(self, x, r, alive=None):
+		ids = np.arange(self.data.shape[0]) if alive is None else np.nonzero(alive)[0]
+		dist = _squaredDistances(np.asarray(x, dtype=np.float64)[None], self.data[ids])[0]
+		keep = dist <= r * r
+		return _sortedHits([(dist[keep], ids[keep])])
+
+def _sortedHits(found):
+	dist = np.concatenate([d for d, _ in found]) if found else np.empty(0)
+	ind = np.concatenate([i for _, i in found]) if found else np.empty(0, dtype=np.intp)
+	order = np.lexsort((ind, dist))
+	return np.sqrt(dist[order]), ind[order]
+
+def buildIndex(data, algorithm='auto', leafSize=40, **forestParams):
+	'''Builds a neighbour index over the rows of data.
+
+	algorithm is 'kd_tree', 'ball_tree', 'rp_forest', 'brute' or 'auto'. A tree
+	only prunes well while the rows outnumber the 2**d cells it can split the
+	space into, so 'auto' picks a KD-tree in that case and falls back to brute
+	force otherwise. 'rp_forest' is approximate; forestParams go to RPForest.
+	'''
+	data = np.asarray(data, dtype=np.float64)
+	if algorithm == 'auto':
+		n, d = data.shape
+		algorithm = 'kd_tree' if d < 31 and 2 ** d <= n else 'brute'
+	if algorithm == 'kd_tree':
+		return KDTree(data, leafSize)
+	if algorithm == 'ball_tree':
+		return BallTree(data, leafSize)
+	if algorithm == 'rp_forest':
+		return RPForest(data, leafSize=leafSize, **forestParams)
+	if algorithm == 'brute':
+		return BruteIndex(data)
+	raise ValueError('unknown algorithm %r' % algorithm)
+
 def getResponse(neighbors):
 	classVotes = {}
 	for x in range(len(neighbors)):
@@ -43,9 +345,451 @@ def getResponse(neighbors):
 			classVotes[response] += 1
 		else:
 			classVotes[response] = 1
-	sortedVotes = sorted(classVotes.items(), key=operator.itemgetter(1), reverse=True)
-	return sortedVotes[0][0]
+	return max(classVotes, key=classVotes.get)
  
+def _squaredDistances(queries, points):
+	# queries (b, d); points (m, d) shared by all queries or (b, m, d) one pool per query.
+	# features are accumulated one at a time in the same order as euclideanDistance
+	if points.ndim == 2:
+		points = points[None]
+	out = np.zeros((queries.shape[0], points.shape[1]))
+	for j in range(queries.shape[1]):
+		diff = queries[:, None, j] - points[:, :, j]
+		out += diff * diff
+	return out
+
+def _manhattan(Q, X, p=None):
+	out = np.zeros((Q.shape[0], X.shape[0]))
+	for j in range(Q.shape[1]):
+		out += np.abs(Q[:, None, j] - X[None, :, j])
+	return out
+
+def _minkowski(Q, X, p=2):
+	out = np.zeros((Q.shape[0], X.shape[0]))
+	for j in range(Q.shape[1]):
+		out += np.abs(Q[:, None, j] - X[None, :, j]) ** p
+	return out ** (1.0 / p)
+
+def _cosine(Q, X, p=None):
+	norms = np.sqrt((Q * Q).sum(1))[:, None] * np.sqrt((X * X).sum(1))[None, :]
+	with np.errstate(invalid='ignore', divide='ignore'):
+		sim = Q.dot(X.T) / norms
+	# a zero vector has no direction; treat it as orthogonal to everything.
+	# rounding can push sim just past +-1, which would make parallel vectors
+	# slightly negative distances apart
+	return 1.0 - np.clip(np.where(norms > 0, sim, 0.0), -1.0, 1.0)
+
+def _hamming(Q, X, p=None):
+	out = np.zeros((Q.shape[0], X.shape[0]))
+	for j in range(Q.shape[1]):
+		out += Q[:, None, j] != X[None, :, j]
+	return out / Q.shape[1]
+
+# metric name -> f(Q, X, p) returning the (len(Q), len(X)) distance matrix;
+# 'euclidean' has its own matrix-product path in KNNClassifier
+METRICS = {
+	'manhattan': _manhattan,
+	'minkowski': _minkowski,
+	'cosine': _cosine,
+	'hamming': _hamming,
+}
+
+def _selectK(D, k):
+	# k smallest per row ordered by (distance, index), like a stable full sort
+	n = D.shape[1]
+	if k < n:
+		pool = np.argpartition(D, k - 1, axis=1)[:, :k]
+	else:
+		pool = np.broadcast_to(np.arange(n), D.shape)
+	dist = np.take_along_axis(D, pool, 1)
+	order = np.lexsort((pool, dist))
+	ind = np.take_along_axis(pool, order, 1)
+	dist = np.take_along_axis(dist, order, 1)
+	if k < n:
+		# argpartition may cut a run of equal distances at an arbitrary index
+		kth = dist[:, -1:]
+		for i in np.nonzero((D == kth).sum(1) > (dist == kth).sum(1))[0]:
+			ind[i] = np.argsort(D[i], kind='stable')[:k]
+			dist[i] = D[i, ind[i]]
+	return dist, ind
+
+class KNNClassifier(object):
+	'''Batch k-NN classifier giving the same votes as getNeighbors + getResponse.
+
+	Distances for blockSize test rows at a time come from one matrix product,
+	the k nearest are picked with np.argpartition instead of a full sort, and
+	ties are broken by training order like the stable sort in getNeighbors.
+	blockSize bounds the (blockSize, n_train) distance matrix held in memory.
+	algorithm other than 'brute' answers queries from buildIndex instead;
+	'rp_forest' is the opt-in approximate mode, tuned with nTrees and searchK.
+	nJobs > 1 (or -1 for every core) scores test rows on a process pool.
+
+	metric is 'euclidean', a name in METRICS ('minkowski' uses p) or a
+	function f(Q, X) returning the distance matrix; the indexes only support
+	'euclidean'. weights is 'uniform', 'distance' (votes weighted by 1/d) or
+	a function mapping the neighbour distance matrix to vote weights.
+
+	The reference set can change after fit: partial_fit appends rows and
+	returns their ids, delete drops rows by id. Rows live in growable arrays;
+	appended rows are scanned next to the index until they make up an eighth
+	of it, and deleted rows are masked until half the rows are dead.
+	'''
+	def __init__(self, k=3, blockSize=1024, algorithm='brute', leafSize=40,
+			nTrees=10, searchK=None, seed=None, nJobs=1,
+			metric='euclidean', p=2, weights='uniform'):
+		if k < 1:
+			raise ValueError('k must be at least 1')
+		if searchK is not None and searchK < k:
+			raise ValueError('searchK=%d must be at least k=%d' % (searchK, k))
+		self.k = k
+		self.blockSize = blockSize
+		self.algorithm = algorithm
+		self.leafSize = leafSize
+		self.nTrees = nTrees
+		self.searchK = searchK
+		self.seed = seed
+		self.nJobs = nJobs
+		self.metric = metric
+		self.p = p
+		self.weights = weights
+
+	def fit(self, trainingSet, labels=None):
+		'''trainingSet rows carry the class in the last column unless labels are given'''
+		if self.algorithm != 'brute' and self.metric != 'euclidean':
+			raise ValueError('algorithm %r only supports the euclidean metric' % self.algorithm)
+		if self.searchK is not None and self.searchK < self.k:
+			raise ValueError('searchK=%d must be at least k=%d' % (self.searchK, self.k))
+		data, labels = self._rows(trainingSet, labels)
+		self.classes_, codes = np.unique(labels, return_inverse=True)
+		n = data.shape[0]
+		self._buf = np.array(data)
+		self._codeBuf = codes.astype(np.intp)
+		self._idBuf = np.arange(n, dtype=np.int64)
+		self._aliveBuf = np.ones(n, dtype=bool)
+		self._sqnormBuf = (self._buf * self._buf).sum(1)
+		self._n = n
+		self._nDead = 0
+		self._nextId = n
+		self._views()
+		self._rebuildIndex()
+		return self
+
+	def partial_fit(self, trainingSet, labels=None):
+		'''appends rows to the reference set and returns their ids'''
+		if not hasattr(self, '_buf'):
+			self.fit(trainingSet, labels)
+			return self._ids.copy()
+		data, labels = self._rows(trainingSet, labels)
+		if data.shape[1] != self._X.shape[1]:
+			raise ValueError('expected %d feature columns, got %d' % (self._X.shape[1], data.shape[1]))
+		classes = np.union1d(self.classes_, labels)
+		if len(classes) != len(self.classes_):
+			self._codeBuf[:self._n] = np.searchsorted(classes, self.classes_)[self._codes]
+			self.classes_ = classes
+		m = data.shape[0]
+		self._reserve(self._n + m)
+		new = slice(self._n, self._n + m)
+		self._buf[new] = data
+		self._codeBuf[new] = np.searchsorted(self.classes_, labels)
+		self._idBuf[new] = np.arange(self._nextId, self._nextId + m)
+		self._aliveBuf[new] = True
+		self._sqnormBuf[new] = (data * data).sum(1)
+		self._n += m
+		self._nextId += m
+		self._views()
+		# also checked without an index, so 'auto' picks one once the rows outgrow 2**d
+		if self._n - self._indexed > max(4 * self.leafSize, self._indexed // 8):
+			self._rebuildIndex()
+		return self._idBuf[new].copy()
+
+	def delete(self, ids):
+		'''removes the rows with the given ids from the reference set'''
+		ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+		pos = np.searchsorted(self._ids, ids)
+		found = pos < self._n
+		found[found] = (self._ids[pos[found]] == ids[found]) & self._alive[pos[found]]
+		if not found.all():
+			raise KeyError('unknown ids: %r' % ids[~found].tolist())
+		self._alive[pos] = False
+		self._nDead = self._n - int(self._alive.sum())
+		if 2 * self._nDead > self._n:
+			keep = self._alive.copy()
+			self._n = int(keep.sum())
+			for name in ('_buf', '_codeBuf', '_idBuf', '_aliveBuf', '_sqnormBuf'):
+				getattr(self, name)[:self._n] = getattr(self, name)[:len(keep)][keep]
+			self._nDead = 0
+			self._views()
+			self._rebuildIndex()
+
+	def _rows(self, trainingSet, labels):
+		data = np.asarray(trainingSet, dtype=np.float64)
+		if data.ndim == 1:
+			data = data[None]
+		if labels is None:
+			data, labels = data[:, :-1], data[:, -1]
+		return data, np.atleast_1d(np.asarray(labels))
+
+	def _reserve(self, size):
+		capacity = self._buf.shape[0]
+		if size <= capacity:
+			return
+		capacity = max(size, 2 * capacity)
+		for name in ('_buf', '_codeBuf', '_idBuf', '_aliveBuf', '_sqnormBuf'):
+			old = getattr(self, name)
+			grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+			grown[:self._n] = old[:self._n]
+			setattr(self, name, grown)
+
+	def _views(self):
+		self._X = self._buf[:self._n]
+		self._codes = self._codeBuf[:self._n]
+		self._ids = self._idBuf[:self._n]
+		self._alive = self._aliveBuf[:self._n]
+		self._sqnorms = self._sqnormBuf[:self._n]
+
+	def _rebuildIndex(self):
+		self._indexed = self._n
+		self._index = None
+		if self.algorithm != 'brute' and self._n:
+			params = {}
+			if self.algorithm == 'rp_forest':
+				params = dict(nTrees=self.nTrees, searchK=self.searchK, seed=self.seed)
+			self._index = buildIndex(self._X, self.algorithm, self.leafSize, **params)
+			if isinstance(self._index, BruteIndex):
+				self._index = None
+
+	def _features(self, testSet):
+		'''accepts bare feature rows or testSet rows whose last column is the class'''
+		data = np.asarray(testSet, dtype=np.float64)
+		if data.ndim == 1:
+			data = data[None]
+		d = self._X.shape[1]
+		if data.shape[1] == d + 1:
+			data = data[:, :d]
+		elif data.shape[1] != d:
+			raise ValueError('expected %d feature columns, got %d' % (d, data.shape[1]))
+		return data
+
+	def kneighbors(self, testSet):
+		'''returns (distances, ids) of the k nearest training rows, nearest first'''
+		dist, ind = self._query(testSet)
+		return dist, self._ids[ind]
+
+	def _query(self, testSet):
+		Q = self._features(testSet)
+		if self.k > self._n - self._nDead:
+			raise ValueError('k=%d exceeds the %d training rows' % (self.k, self._n - self._nDead))
+		nJobs = os.cpu_count() if self.nJobs == -1 else self.nJobs
+		if nJobs > 1 and Q.shape[0] > self.blockSize:
+			return self._kneighborsParallel(Q, nJobs)
+		return self._kneighbors(Q)
+
+	def _kneighbors(self, Q):
+		dist = np.empty((Q.shape[0], self.k))
+		ind = np.empty((Q.shape[0], self.k), dtype=np.intp)
+		if self._index is None:
+			rows = np.nonzero(self._alive)[0] if self._nDead else None
+			for start in range(0, Q.shape[0], self.blockSize):
+				stop = start + self.blockSize
+				dist[start:stop], ind[start:stop] = self._kneighborsBlock(Q[start:stop], rows)
+			return dist, ind
+		# rows appended since the index was built are scanned by brute force
+		# and merged with the index answer
+		alive = self._alive[:self._indexed] if self._nDead else None
+		tail = np.arange(self._indexed, self._n)[self._alive[self._indexed:]]
+		for start in range(0, Q.shape[0], self.blockSize):
+			block = Q[start:start + self.blockSize]
+			if len(tail):
+				tailDist, tailInd = self._kneighborsBlock(block, tail)
+			for i in range(block.shape[0]):
+				d, j = self._index.query(block[i], self.k, alive)
+				if len(tail):
+					d, j = np.concatenate((d, tailDist[i])), np.concatenate((j, tailInd[i]))
+					order = np.lexsort((j, d))[:self.k]
+					d, j = d[order], j[order]
+				dist[start + i], ind[start + i] = d, j
+		return dist, ind
+
+	def _kneighborsParallel(self, Q, nJobs):
+		# workers memory-map one .npy copy of the training matrix instead of
+		# unpickling their own; each row's answer does not depend on which
+		# block it lands in, so the result equals the serial path
+		tmpDir = tempfile.mkdtemp(prefix='knn-')
+		try:
+			path = os.path.join(tmpDir, 'train.npy')
+			np.save(path, self._X)
+			index = None
+			if self._index is not None:
+				index = copy.copy(self._index)
+				index.data = None
+			state = dict(alive=self._alive if self._nDead else None, indexed=self._indexed)
+			blocks = [Q[start:start + self.blockSize] for start in range(0, Q.shape[0], self.blockSize)]
+			with ProcessPoolExecutor(nJobs, initializer=_initWorker,
+					initargs=(path, index, self._workerParams(), state)) as pool:
+				results = list(pool.map(_workerKneighbors, blocks))
+		finally:
+			shutil.rmtree(tmpDir, ignore_errors=True)
+		return (np.concatenate([d for d, _ in results]), np.concatenate([i for _, i in results]))
+
+	def _workerParams(self):
+		return dict(k=self.k, blockSize=self.blockSize, metric=self.metric, p=self.p)
+
+	def measureRecall(self, testSet, sampleSize=100, seed=None):
+		'''Fraction of the exact k nearest neighbours that the index returns.
+
+		The exact answer comes from the brute-force block path, which picks the
+		same neighbours as getNeighbors, on a random sample of the test rows.
+		'''
+		Q = self._features(testSet)
+		rng = np.random.default_rng(seed)
+		Q = Q[rng.choice(Q.shape[0], min(sampleSize, Q.shape[0]), replace=False)]
+		_, found = self._query(Q)
+		rows = np.nonzero(self._alive)[0] if self._nDead else None
+		hits = 0
+		for start in range(0, Q.shape[0], self.blockSize):
+			_, exact = self._kneighborsBlock(Q[start:start + self.blockSize], rows)
+			for a, b in zip(found[start:start + self.blockSize], exact):
+				hits += len(np.intersect1d(a, b))
+		return hits / float(Q.shape[0] * self.k)
+
+	def _kneighborsBlock(self, Q, rows=None):
+		# brute force over all rows, or only over the given row positions
+		X, sqnorms = self._X, self._sqnorms
+		if rows is not None:
+			X, sqnorms = X[rows], sqnorms[rows]
+		n = X.shape[0]
+		k = min(self.k, n)
+		if self.metric != 'euclidean':
+			if callable(self.metric):
+				D = self.metric(Q, X)
+			else:
+				D = METRICS[self.metric](Q, X, self.p)
+			dist, ind = _selectK(D, k)
+			return dist, ind if rows is None else rows[ind]
+		qnorms = (Q * Q).sum(1)
+		approx = qnorms[:, None] - 2.0 * Q.dot(X.T) + sqnorms[None, :]
+		# the expanded form is fast but inexact, so a slightly larger pool is
+		# re-ranked with exact distances and checked against the rounding bound
+		m = min(n, 2 * k + 8)
+		if m < n:
+			pool = np.argpartition(approx, m - 1, axis=1)[:, :m]
+		else:
+			pool = np.broadcast_to(np.arange(n), (Q.shape[0], n))
+		exact = _squaredDistances(Q, X[pool])
+		order = np.lexsort((pool, exact))[:, :k]
+		ind = np.take_along_axis(pool, order, 1)
+		dist = np.take_along_axis(exact, order, 1)
+		if m < n:
+			tol = 16 * (X.shape[1] + 2) * np.finfo(np.float64).eps * (qnorms + sqnorms.max())
+			bound = np.take_along_axis(approx, pool, 1).max(1) - tol
+			for i in np.nonzero(bound <= dist[:, -1])[0]:
+				row = _squaredDistances(Q[i:i + 1], X)[0]
+				ind[i] = np.argsort(row, kind='stable')[:k]
+				dist[i] = row[ind[i]]
+		return np.sqrt(dist), ind if rows is None else rows[ind]
+
+	def _voteWeights(self, dist):
+		if self.weights == 'uniform':
+			return None
+		if self.weights == 'distance':
+			if (dist < 0).any():
+				raise ValueError('distance weights need non-negative distances, the metric returned %g' % dist.min())
+			# exact matches outvote everything else, as 1/0 would
+			with np.errstate(divide='ignore'):
+				w = 1.0 / dist
+			exact = np.isinf(w)
+			return np.where(exact.any(1, keepdims=True), exact.astype(np.float64), w)
+		return np.asarray(self.weights(dist), dtype=np.float64)
+
+	def _vote(self, codes, weights=None):
+		# (weighted) majority vote per row; among tied classes the one met first
+		# in the neighbour list wins, which is what getResponse's stable sort does
+		b, k = codes.shape
+		C = len(self.classes_)
+		rows = np.arange(b)
+		votes = np.bincount((rows[:, None] * C + codes).ravel(),
+			weights=None if weights is None else weights.ravel(), minlength=b * C).reshape(b, C)
+		first = np.full((b, C), k)
+		for j in range(k - 1, -1, -1):
+			first[rows, codes[:, j]] = j
+		first[votes != votes.max(1, keepdims=True)] = k + 1
+		return first.argmin(1)
+
+	def predict(self, testSet):
+		dist, ind = self._query(testSet)
+		return self.classes_[self._vote(self._codes[ind], self._voteWeights(dist))]
+
+_worker = None
+
+def _initWorker(path, index, params, state):
+	global _worker
+	model = KNNClassifier(**params)
+	model._X = np.load(path, mmap_mode='r')
+	model._sqnorms = (model._X * model._X).sum(1)
+	model._n = model._X.shape[0]
+	model._alive = state['alive'] if state['alive'] is not None else np.ones(model._n, dtype=bool)
+	model._nDead = model._n - int(model._alive.sum())
+	model._indexed = state['indexed']
+	model._index = index
+	if index is not None:
+		index.data = model._X
+	_worker = model
+
+def _workerKneighbors(Q):
+	return _worker._kneighbors(Q)
+
+def crossValidate(trainingSet, kMax, folds=None, labels=None, seed=None, **params):
+	'''Accuracy (in percent, like getAccuracy) of every k from 1 to kMax.
+
+	folds=None runs leave-one-out, otherwise rows are shuffled with seed into
+	that many folds. Neighbours are ordered once up to kMax and every k is
+	scored from a prefix of that ordering, so the sweep costs about one run.
+	params go to KNNClassifier (metric, weights, blockSize, ...).
+	'''
+	data = np.asarray(trainingSet, dtype=np.float64)
+	if labels is None:
+		data, labels = data[:, :-1], data[:, -1]
+	classes, codes = np.unique(np.asarray(labels), return_inverse=True)
+	n = data.shape[0]
+	model = KNNClassifier(kMax, **params)
+	if folds is None:
+		# each row is its own nearest neighbour (or ties with a duplicate), so
+		# ask for one more and drop the row itself wherever it shows up
+		model.k = min(kMax + 1, n)
+		dist, ind = model.fit(data, codes).kneighbors(data)
+		isSelf = ind == np.arange(n)[:, None]
+		selfPos = np.where(isSelf.any(1), isSelf.argmax(1), ind.shape[1] - 1)
+		keep = np.arange(ind.shape[1])[None, :] != selfPos[:, None]
+		dist = dist[keep].reshape(n, -1)[:, :kMax]
+		ind = ind[keep].reshape(n, -1)[:, :kMax]
+	else:
+		foldOf = np.empty(n, dtype=np.intp)
+		foldOf[np.random.default_rng(seed).permutation(n)] = np.arange(n) % folds
+		dist = np.empty((n, kMax))
+		ind = np.empty((n, kMax), dtype=np.intp)
+		for f in range(folds):
+			test, train = np.nonzero(foldOf == f)[0], np.nonzero(foldOf != f)[0]
+			dist[test], local = model.fit(data[train], codes[train]).kneighbors(data[test])
+			ind[test] = train[local]
+	kMax = ind.shape[1]
+	neighbourCodes = codes[ind]
+	weights = model._voteWeights(dist)
+	if weights is None:
+		weights = np.ones(dist.shape)
+	rows = np.arange(n)
+	first = np.full((n, len(classes)), kMax)
+	for j in range(kMax - 1, -1, -1):
+		first[rows, neighbourCodes[:, j]] = j
+	votes = np.zeros((n, len(classes)))
+	accuracy = {}
+	for k in range(1, kMax + 1):
+		votes[rows, neighbourCodes[:, k - 1]] += weights[:, k - 1]
+		seen = first < k
+		best = seen & (votes == np.where(seen, votes, -np.inf).max(1, keepdims=True))
+		winner = np.where(best, first, kMax + 1).argmin(1)
+		accuracy[k] = float((winner == codes).mean()) * 100.0
+	return accuracy
+
 def getAccuracy(testSet, predictions):
 	correct = 0
 	for x in range(len(testSet)):
@@ -62,13 +806,10 @@ def main():
 	print('Train set: ' + repr(len(trainingSet)))
 	print('Test set: ' + repr(len(testSet)))
 	# generate predictions
-	predictions=[]
 	k = 3
+	predictions = KNNClassifier(k).fit(trainingSet).predict(testSet).tolist()
 	for x in range(len(testSet)):
-		neighbors = getNeighbors(trainingSet, testSet[x], k)
-		result = getResponse(neighbors)
-		predictions.append(result)
-		print('> predicted=' + repr(result) + ', actual=' + repr(testSet[x][-1]))
+		print('> predicted=' + repr(predictions[x]) + ', actual=' + repr(testSet[x][-1]))
 	accuracy = getAccuracy(testSet, predictions)
 	print('Accuracy: ' + repr(accuracy) + '%')
 	